@@ -4,6 +4,8 @@ A build script which can be used to compile animations and build the website.
 Fuzzy matching is used to enable quickly specifying targets in the website folder.
 """
 
+import filecmp
+import hashlib
 import inspect
 import os
 import subprocess
@@ -12,9 +14,19 @@ import sys
 import pathlib
 import importlib
 import re
+import json
 
 from thefuzz import process, fuzz
 
+from library.render import (
+    scheduler,
+    verify,
+    profiling,
+    memory,
+    snapshot,
+    cache as render_cache,
+)
+
 # prevent manim from printing
 sys.stdout = open(os.devnull, "w")
 import manim as mn
@@ -28,6 +40,34 @@ quality_folder_lookup = {"l": "480p15", "m": "720p30", "h": "1080p60"}
 
 exclude_folders = ["__pycache__", "media", "_style"]
 
+stats_path = pathlib.Path("media/render_stats.json")
+
+default_cache_path = pathlib.Path("media/render_cache")
+
+verify_output_path = pathlib.Path("media/verify")
+
+preview_output_path = pathlib.Path("media/preview")
+
+dry_run_output_path = pathlib.Path("media/dry_run")
+
+profile_output_path = pathlib.Path("media/profile")
+
+memory_profile_output_path = pathlib.Path("media/memory_profile")
+
+snapshot_cache_path = pathlib.Path("media/snapshot_cache")
+
+export_output_path = pathlib.Path("media/export")
+
+export_suffix_lookup = {"vector": ".svg", "still": ".still.svg"}
+"Maps each export mode of the worker to the suffix of the file it writes next to a scene's video."
+
+website_output_path = pathlib.Path("build/html")
+
+doctree_path = pathlib.Path("build/doctrees")
+
+animation_index_path = doctree_path / "animation_index.json"
+"Maps each scene to its video to the documents embedding it. Written by the website build (extensions.animation)."
+
 split_regex = "A-Z_/\\\\"
 
 
@@ -79,23 +119,159 @@ def get_scene_names(file_path: pathlib.Path) -> list[str]:
     ]
 
 
-def move_output(quality: str, file_path: pathlib.Path, scene_name: str) -> None:
-    """Moves produced files from media to the appropriate location in website."""
-    quality_folder = quality_folder_lookup[quality]
+def get_render_path(
+    quality: str, file_path: pathlib.Path, scene_name: str
+) -> pathlib.Path:
+    """Returns the path a scene is rendered to."""
+    return pathlib.Path(
+        "media/videos",
+        file_path.stem,
+        quality_folder_lookup[quality],
+        "{}.mp4".format(scene_name),
+    )
+
 
-    path, sub_folder = os.path.split(file_path)
+def get_website_path(file_path: pathlib.Path, scene_name: str) -> pathlib.Path:
+    """Returns the path of a scene's video in website."""
+    return file_path.parent / "media" / "{}.mp4".format(scene_name)
 
-    # -p suppresses errors
-    subprocess.run("mkdir -p {}/media".format(path), shell=True)
 
-    # for scene in scenes:
-    move_command = "mv media/videos/{sub_folder}/{quality_folder}/{scene_name}.mp4 {path}/media/.".format(
-        sub_folder=sub_folder.removesuffix(".py"),
-        scene_name=scene_name,
-        quality_folder=quality_folder,
-        path=path,
+def find_video_scenes(video_paths: list[pathlib.Path]) -> dict[str, pathlib.Path]:
+    """Maps videos in website back to the scenes which render them.
+
+    Videos are published to a media folder next to the file defining their scene, so only those files are searched.
+    Returns a mapping of scenes to their files.
+    """
+    file_paths = set(
+        file_path
+        for video_path in video_paths
+        for file_path in get_all_file_paths(video_path.parent.parent)
+    )
+    scenes = get_all_scenes(sorted(file_paths))
+    video_index = dict(
+        (get_website_path(file_path, scene_name).resolve(), scene_name)
+        for scene_name, file_path in scenes.items()
+    )
+
+    found: dict[str, pathlib.Path] = {}
+    for video_path in video_paths:
+        scene_name = video_index.get(video_path.resolve())
+        if scene_name is None:
+            print("No scene renders {}".format(video_path))
+            continue
+        found[scene_name] = scenes[scene_name]
+    return found
+
+
+def is_published(
+    file_path: pathlib.Path, scene_name: str, cache: render_cache.RenderCache
+) -> bool:
+    """Returns True if the video of a scene in website was rendered from the scene's current source (at any quality)."""
+    website_path = get_website_path(file_path, scene_name)
+    if not website_path.exists():
+        return False
+    for quality in quality_folder_lookup:
+        key = render_cache.scene_key(file_path, scene_name, quality)
+        cache_path = cache.lookup(key)
+        if cache_path is not None and filecmp.cmp(
+            cache_path, website_path, shallow=False
+        ):
+            return True
+    return False
+
+
+def hash_website_video(file_path: pathlib.Path, scene_name: str) -> str | None:
+    """Returns the hash of a scene's video in website, or None if it hasn't been rendered."""
+    website_path = get_website_path(file_path, scene_name)
+    if not website_path.exists():
+        return None
+    return hashlib.sha256(website_path.read_bytes()).hexdigest()
+
+
+def get_affected_documents(scenes: dict[str, pathlib.Path]) -> list[str]:
+    """Returns the names of the documents which embed the videos of scenes, e.g. design/plate/plate.
+
+    Uses the animation index written by the last website build, so documents are only found once the website has
+    been built.
+    """
+    if not animation_index_path.exists():
+        return []
+    index: dict[str, dict[str, list[str]]] = json.loads(
+        animation_index_path.read_text()
     )
-    subprocess.run(move_command, shell=True)
+    documents = set()
+    for scene_name, file_path in scenes.items():
+        website_path = get_website_path(file_path, scene_name)
+        for video_path, video_documents in index.get(scene_name, {}).items():
+            if pathlib.Path(video_path) == website_path:
+                documents.update(
+                    pathlib.Path(document)
+                    .relative_to(source_path)
+                    .with_suffix("")
+                    .as_posix()
+                    for document in video_documents
+                )
+    return sorted(documents)
+
+
+def make_website(changed_scenes: dict[str, pathlib.Path]) -> None:
+    """Incrementally builds the website.
+
+    Sphinx rebuilds every outdated document on its own. The documents which embed changed_scenes are also passed to
+    the animation extension, which marks them as outdated in case their videos weren't detected as changed.
+    """
+    command = [
+        "sphinx-build",
+        "-b",
+        "html",
+        "-d",
+        str(doctree_path),
+        str(source_path),
+        str(website_output_path),
+    ]
+    documents = get_affected_documents(changed_scenes)
+    if documents:
+        print(
+            "Rebuilding {} documents which embed changed scenes".format(len(documents))
+        )
+        command.extend(
+            ["-D", "animation_changed_documents={}".format(",".join(documents))]
+        )
+    subprocess.run(command)
+
+
+def get_export_path(
+    file_path: pathlib.Path, scene_name: str, mode: str
+) -> pathlib.Path:
+    """Returns the path of a scene's export (e.g. its animated svg) in website."""
+    suffix = export_suffix_lookup[mode]
+    return file_path.parent / "media" / "{}{}".format(scene_name, suffix)
+
+
+def get_verify_output_path(file_path: pathlib.Path, scene_name: str) -> pathlib.Path:
+    """Returns the path the frame hashes of a verified scene are written to."""
+    return verify_output_path / file_path.stem / "{}.json".format(scene_name)
+
+
+def get_poster_path(file_path: pathlib.Path, scene_name: str) -> pathlib.Path:
+    """Returns the path of a scene's poster (a representative frame of its video) in website."""
+    return file_path.parent / "media" / "{}.poster.png".format(scene_name)
+
+
+def get_video_poster_path(video_path: pathlib.Path) -> pathlib.Path:
+    """Returns the path of the poster stored next to a rendered or cached video, e.g. Scene.poster.png."""
+    return video_path.with_name("{}.poster.png".format(video_path.stem))
+
+
+def publish_output(
+    cache_path: pathlib.Path, file_path: pathlib.Path, scene_name: str
+) -> None:
+    """Copies a cached render and its poster to the appropriate location in website."""
+    render_cache.atomic_copy(cache_path, get_website_path(file_path, scene_name))
+    # posters are written by the render and committed next to their cache entry
+    poster_path = get_video_poster_path(cache_path)
+    if poster_path.exists():
+        render_cache.atomic_copy(poster_path, get_poster_path(file_path, scene_name))
 
 
 def get_arg_parser() -> argparse.ArgumentParser:
@@ -115,6 +291,78 @@ def get_arg_parser() -> argparse.ArgumentParser:
         help="whether to make the website after building",
     )
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="the maximum number of scenes to render in parallel",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=None,
+        help="the memory (in MB) parallel renders may use in total; defaults to 80%% of the available memory",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="run every scene at a low resolution and only fully render scenes whose sampled frames changed",
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="write a contact sheet of the end of each animation step to media/preview instead of rendering videos",
+    )
+    parser.add_argument(
+        "--vector",
+        action="store_true",
+        help="export an animated svg of each scene next to its video (e.g. IntakePlateScene.svg) instead of rendering videos",
+    )
+    parser.add_argument(
+        "--still",
+        action="store_true",
+        help="export a static svg of the final state of each scene next to its video (e.g. IntakePlateScene.still.svg) instead of rendering videos",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="run the logic of each scene without rasterizing or encoding anything and report its length",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="re-render scenes with per-step profiling enabled and print a report; profiles are written to {}".format(
+            profile_output_path
+        ),
+    )
+    parser.add_argument(
+        "--memory-profile",
+        action="store_true",
+        help="re-render scenes while tracing memory around each play call and print a report; reports are written to {}".format(
+            memory_profile_output_path
+        ),
+    )
+    parser.add_argument(
+        "--snapshot-cache",
+        action="store_true",
+        help="reuse the mobjects each scene builds in setup from {} instead of rebuilding them".format(
+            snapshot_cache_path
+        ),
+    )
+    parser.add_argument(
+        "--videos",
+        nargs="+",
+        type=pathlib.Path,
+        help="render the scenes of the given videos in website which are missing or out of date; used by the website build",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=pathlib.Path,
+        default=default_cache_path,
+        help="the render cache directory, which may be shared by several builds at once",
+    )
+
     description = """
     Inputs to the builder. All inputs are parsed using a fuzzy matcher which enables (often aggressive) abbreviations.
     The fuzzer works by comparing tokens in the input with target tokens. 
@@ -178,6 +426,336 @@ def split_tokens(input: str) -> str:
     return " ".join(matches)
 
 
+def print_profiles(scenes: dict[str, pathlib.Path]) -> None:
+    """Prints the profile of each scene which was rendered with profiling enabled."""
+    for scene_name in scenes:
+        report_path = profile_output_path / "{}.json".format(scene_name)
+        if not report_path.exists():
+            continue
+        print(
+            "\nProfile of {} (cProfile stats: {})".format(
+                scene_name, report_path.with_suffix(".pstats")
+            )
+        )
+        print(profiling.format_report(json.loads(report_path.read_text())))
+
+
+def print_memory_profiles(scenes: dict[str, pathlib.Path]) -> None:
+    """Prints the memory report of each scene which was rendered with memory profiling enabled."""
+    for scene_name in scenes:
+        report_path = memory_profile_output_path / "{}.json".format(scene_name)
+        if not report_path.exists():
+            continue
+        print("\nMemory profile of {}".format(scene_name))
+        print(memory.format_report(json.loads(report_path.read_text())))
+
+
+def get_memory_budget(memory_budget: int | None) -> int | None:
+    """Returns the memory budget in bytes. memory_budget is in megabytes."""
+    if memory_budget is not None:
+        return memory_budget * 1024 * 1024
+    available = scheduler.available_memory()
+    return None if available is None else int(available * 0.8)
+
+
+def render_scenes(
+    scenes: dict[str, pathlib.Path],
+    quality: str,
+    cache: render_cache.RenderCache,
+    jobs: int,
+    memory_budget: int | None,
+    refresh: bool = False,
+) -> list[str]:
+    """Renders each scene and copies the result into website. Returns the names of scenes which failed to render.
+
+    Scenes which are already cached are not rendered again unless refresh is True.
+    If another build is currently rendering a scene, we wait for it to finish and reuse its result.
+    """
+    stats = scheduler.MemoryStats(stats_path)
+    failed_scenes: list[str] = []
+    busy = scenes
+    blocking = False
+    while busy:
+        render_jobs, locks, busy = claim_scenes(busy, quality, cache, blocking, refresh)
+        # the second pass waits on the scenes other builds are rendering
+        blocking = True
+        if not render_jobs:
+            continue
+
+        print("Rendering {} scenes".format(len(render_jobs)))
+        failed = scheduler.Scheduler(stats, jobs, memory_budget).run(render_jobs)
+        for job in failed:
+            print("Failed to render {}".format(job.name))
+            failed_scenes.append(job.name.split(":")[1])
+        for lock in locks:
+            lock.release()
+    return failed_scenes
+
+
+def dry_run_scenes(
+    scenes: dict[str, pathlib.Path], jobs: int, memory_budget: int | None
+) -> list[str]:
+    """Runs the logic of each scene and prints a summary. Returns the names of scenes which failed to run."""
+    dry_run_jobs = []
+    for scene_name, file_path in scenes.items():
+        output = dry_run_output_path / file_path.stem / "{}.json".format(scene_name)
+
+        def on_success(
+            file_path=file_path, scene_name=scene_name, output=output
+        ) -> None:
+            summary = json.loads(output.read_text())
+            print(
+                "Ran {} - {}: {} animations, {:.2f}s".format(
+                    file_path, scene_name, summary["animations"], summary["duration"]
+                )
+            )
+
+        command = [
+            sys.executable,
+            "-m",
+            "library.render.worker",
+            "dry-run",
+            str(file_path),
+            scene_name,
+            "--output",
+            str(output),
+        ]
+        dry_run_jobs.append(
+            scheduler.Job(
+                "{}:{}:dry-run".format(file_path, scene_name), command, on_success
+            )
+        )
+
+    print("Running {} scenes".format(len(dry_run_jobs)))
+    stats = scheduler.MemoryStats(stats_path)
+    failed = scheduler.Scheduler(stats, jobs, memory_budget).run(dry_run_jobs)
+    for job in failed:
+        print("Failed to run {}".format(job.name))
+    return [job.name.split(":")[1] for job in failed]
+
+
+def preview_scenes(
+    scenes: dict[str, pathlib.Path], jobs: int, memory_budget: int | None
+) -> list[str]:
+    """Writes a contact sheet for each scene. Returns the names of scenes which failed to run."""
+    preview_jobs = []
+    for scene_name, file_path in scenes.items():
+        output = preview_output_path / file_path.stem / "{}.png".format(scene_name)
+        command = [
+            sys.executable,
+            "-m",
+            "library.render.worker",
+            "preview",
+            str(file_path),
+            scene_name,
+            "--output",
+            str(output),
+        ]
+        preview_jobs.append(
+            scheduler.Job(
+                "{}:{}:preview".format(file_path, scene_name),
+                command,
+                lambda output=output: print("Wrote {}".format(output)),
+            )
+        )
+
+    print("Previewing {} scenes".format(len(preview_jobs)))
+    stats = scheduler.MemoryStats(stats_path)
+    failed = scheduler.Scheduler(stats, jobs, memory_budget).run(preview_jobs)
+    for job in failed:
+        print("Failed to preview {}".format(job.name))
+    return [job.name.split(":")[1] for job in failed]
+
+
+def export_scenes(
+    scenes: dict[str, pathlib.Path],
+    mode: str,
+    cache_dir: pathlib.Path,
+    jobs: int,
+    memory_budget: int | None,
+) -> list[str]:
+    """Exports each scene using a worker mode (e.g. vector) and copies the result into website.
+
+    Exports are cached alongside renders, keyed by the scene's source and mode. Returns the names of scenes which
+    failed to export.
+    """
+    suffix = export_suffix_lookup[mode]
+    cache = render_cache.RenderCache(cache_dir, suffix)
+    export_jobs = []
+    locks = []
+    for scene_name, file_path in scenes.items():
+        key = render_cache.source_key(file_path, scene_name, mode)
+        lock = cache.lock(key)
+        lock.acquire()
+        cache_path = cache.lookup(key)
+        if cache_path is not None:
+            lock.release()
+            print("Using cached {} - {}".format(file_path, scene_name))
+            render_cache.atomic_copy(
+                cache_path, get_export_path(file_path, scene_name, mode)
+            )
+            continue
+
+        output = export_output_path / file_path.stem / "{}{}".format(scene_name, suffix)
+        command = [
+            sys.executable,
+            "-m",
+            "library.render.worker",
+            mode,
+            str(file_path),
+            scene_name,
+            "--output",
+            str(output),
+        ]
+
+        def on_success(
+            file_path=file_path, scene_name=scene_name, key=key, output=output
+        ) -> None:
+            print("Exported {} - {}".format(file_path, scene_name))
+            render_cache.atomic_copy(
+                cache.commit(key, output), get_export_path(file_path, scene_name, mode)
+            )
+
+        export_jobs.append(
+            scheduler.Job(
+                "{}:{}:{}".format(file_path, scene_name, mode), command, on_success
+            )
+        )
+        locks.append(lock)
+
+    print("Exporting {} scenes".format(len(export_jobs)))
+    stats = scheduler.MemoryStats(stats_path)
+    failed = scheduler.Scheduler(stats, jobs, memory_budget).run(export_jobs)
+    for lock in locks:
+        lock.release()
+    for job in failed:
+        print("Failed to export {}".format(job.name))
+    return [job.name.split(":")[1] for job in failed]
+
+
+def verify_scenes(
+    scenes: dict[str, pathlib.Path], jobs: int, memory_budget: int | None
+) -> tuple[dict[str, pathlib.Path], dict[str, list[str]], list[str]]:
+    """Runs each scene at a low resolution and fingerprints a sample of its frames.
+
+    Returns the scenes whose fingerprints don't match their stored fingerprints, the new fingerprints of those scenes,
+    and the names of scenes which failed to run.
+    """
+    verify_jobs = [
+        scheduler.Job(
+            "{}:{}:verify".format(file_path, scene_name),
+            [
+                sys.executable,
+                "-m",
+                "library.render.worker",
+                "verify",
+                str(file_path),
+                scene_name,
+                "--output",
+                str(get_verify_output_path(file_path, scene_name)),
+            ],
+        )
+        for scene_name, file_path in scenes.items()
+    ]
+
+    print("Verifying {} scenes".format(len(verify_jobs)))
+    stats = scheduler.MemoryStats(stats_path)
+    failed = scheduler.Scheduler(stats, jobs, memory_budget).run(verify_jobs)
+    failed_scenes = [job.name.split(":")[1] for job in failed]
+    for job in failed:
+        print("Failed to verify {}".format(job.name))
+
+    changed: dict[str, pathlib.Path] = {}
+    fingerprints: dict[str, list[str]] = {}
+    for scene_name, file_path in scenes.items():
+        if scene_name in failed_scenes:
+            continue
+        output = get_verify_output_path(file_path, scene_name)
+        fingerprint = json.loads(output.read_text())
+        if not verify.is_match(
+            verify.load_fingerprints(file_path).get(scene_name), fingerprint
+        ):
+            print("Fingerprint changed for {} - {}".format(file_path, scene_name))
+            changed[scene_name] = file_path
+            fingerprints[scene_name] = fingerprint
+
+    return changed, fingerprints, failed_scenes
+
+
+def claim_scenes(
+    scenes: dict[str, pathlib.Path],
+    quality: str,
+    cache: render_cache.RenderCache,
+    blocking: bool,
+    refresh: bool,
+) -> tuple[list[scheduler.Job], list[render_cache.EntryLock], dict[str, pathlib.Path]]:
+    """Claims each scene which isn't cached by locking its cache entry.
+
+    Returns a render job and a lock for each claimed scene, as well as the scenes which are locked by another build.
+    """
+    render_jobs: list[scheduler.Job] = []
+    locks: list[render_cache.EntryLock] = []
+    busy: dict[str, pathlib.Path] = {}
+
+    for scene_name, file_path in scenes.items():
+        key = render_cache.scene_key(file_path, scene_name, quality)
+        cache_path = None if refresh else cache.lookup(key)
+        if cache_path is None:
+            lock = cache.lock(key)
+            if not lock.acquire(blocking):
+                busy[scene_name] = file_path
+                continue
+            # another build may have committed the entry before we got the lock
+            cache_path = None if refresh else cache.lookup(key)
+            if cache_path is not None:
+                lock.release()
+
+        if cache_path is not None:
+            print("Using cached {} - {}".format(file_path, scene_name))
+            publish_output(cache_path, file_path, scene_name)
+            continue
+
+        render_command = [
+            sys.executable,
+            "-m",
+            "library.render.worker",
+            "render",
+            str(file_path),
+            scene_name,
+            "--quality",
+            quality,
+            "--output",
+            str(get_render_path(quality, file_path, scene_name)),
+            "--poster",
+            str(get_video_poster_path(get_render_path(quality, file_path, scene_name))),
+        ]
+
+        def on_success(
+            file_path=file_path, scene_name=scene_name, key=key, lock=lock
+        ) -> None:
+            print("Rendered {} - {}".format(file_path, scene_name))
+            render_path = get_render_path(quality, file_path, scene_name)
+            # the poster is committed first, so other builds always find it once the video is committed
+            render_cache.atomic_copy(
+                get_video_poster_path(render_path),
+                get_video_poster_path(cache.entry_path(key)),
+            )
+            publish_output(cache.commit(key, render_path), file_path, scene_name)
+            lock.release()
+
+        # the quality is part of the name since memory stats are keyed by name and depend on the resolution
+        render_jobs.append(
+            scheduler.Job(
+                "{}:{}:{}".format(file_path, scene_name, quality),
+                render_command,
+                on_success,
+            )
+        )
+        locks.append(lock)
+
+    return render_jobs, locks, busy
+
+
 def main():
     args = get_arg_parser().parse_args()
 
@@ -207,21 +785,96 @@ def main():
         results = fuzzy_search(list(scenes.keys()), args.scene)
         scenes = dict([(k, v) for k, v in scenes.items() if k in results])
 
-    for scene_name, file_path in scenes.items():
-        manim_command = (
-            "manim render -v ERROR -q{quality} {file_path} {scene_names}".format(
-                quality=quality,
-                file_path=file_path,
-                scene_names=scene_name,  # " ".join(scene_names),
+    cache = render_cache.RenderCache(args.cache_dir)
+    if args.videos is not None:
+        scenes = dict(
+            (scene_name, file_path)
+            for scene_name, file_path in find_video_scenes(args.videos).items()
+            if not is_published(file_path, scene_name, cache)
+        )
+
+    memory_budget = get_memory_budget(args.memory_budget)
+
+    # inherited by every scene process, including dry runs, previews and verification
+    if args.snapshot_cache:
+        os.environ[snapshot.ENV_VAR] = str(snapshot_cache_path.absolute())
+
+    if args.dry_run:
+        if dry_run_scenes(scenes, args.jobs, memory_budget):
+            sys.exit(1)
+        return
+
+    if args.preview:
+        if preview_scenes(scenes, args.jobs, memory_budget):
+            sys.exit(1)
+        return
+
+    export_modes = [
+        mode
+        for mode, enabled in [("vector", args.vector), ("still", args.still)]
+        if enabled
+    ]
+    if export_modes:
+        failed_exports = [
+            scene_name
+            for mode in export_modes
+            for scene_name in export_scenes(
+                scenes, mode, args.cache_dir, args.jobs, memory_budget
             )
+        ]
+        if failed_exports:
+            sys.exit(1)
+        return
+
+    failed_scenes: list[str] = []
+    fingerprints: dict[str, list[str]] = {}
+    if args.verify:
+        scenes, fingerprints, failed_scenes = verify_scenes(
+            scenes, args.jobs, memory_budget
         )
 
-        print("Rendering {} - {}".format(file_path, scene_name))
-        subprocess.run(manim_command, shell=True)
-        move_output(quality, file_path, scene_name)
+    # inherited by the render processes
+    if args.profile:
+        os.environ[profiling.ENV_VAR] = str(profile_output_path.absolute())
+    if args.memory_profile:
+        os.environ[memory.ENV_VAR] = str(memory_profile_output_path.absolute())
+
+    previous_hashes = dict(
+        (scene_name, hash_website_video(file_path, scene_name))
+        for scene_name, file_path in scenes.items()
+    )
+    failed_renders = render_scenes(
+        scenes,
+        quality,
+        cache,
+        args.jobs,
+        memory_budget,
+        refresh=args.profile or args.memory_profile,
+    )
+    failed_scenes.extend(failed_renders)
+
+    if args.profile:
+        print_profiles(scenes)
+    if args.memory_profile:
+        print_memory_profiles(scenes)
+
+    # only store fingerprints once the scene has rendered successfully
+    for scene_name, fingerprint in fingerprints.items():
+        if scene_name not in failed_renders:
+            verify.save_fingerprint(scenes[scene_name], scene_name, fingerprint)
 
     if args.make:
-        subprocess.run("make html", shell=True)
+        make_website(
+            dict(
+                (scene_name, file_path)
+                for scene_name, file_path in scenes.items()
+                if hash_website_video(file_path, scene_name)
+                != previous_hashes[scene_name]
+            )
+        )
+
+    if failed_scenes:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -4,10 +4,12 @@ A sphinx extension designed to work with the build script to automatically inser
 Supports .mp4 videos compiled by the build script.
 """
 
-from typing import Dict, List, cast
+from typing import Dict, List, Tuple, cast
 from pathlib import Path
+import json
 
-from sphinx import application
+from sphinx import application, environment
+from sphinx.environment import collectors
 from sphinx.util import docutils as sphinx_docutils, typing, logging
 
 from docutils.parsers.rst import directives as docutils_directives
@@ -16,18 +18,44 @@ from docutils import nodes
 # from myst_parser.parsers import directives as myst_directives
 from myst_parser import mocking as myst_mocking
 
-from extensions import video
+from extensions import video, render, timing, weight
 
 logger = logging.getLogger(__name__)
 
 SIZE_LOOKUP: Dict[str, str] = {"small": "60%", "standard": "80%"}
 "Maps size options to the width"
 
+SOURCE_FORMATS: List[Tuple[str, str]] = [
+    (".av1.webm", 'video/webm; codecs="av01.0.05M.08"'),
+    (".webm", 'video/webm; codecs="vp9"'),
+    (".mp4", "video/mp4"),
+]
+"""Maps the suffix of each supported video format to its mime type, best first.
+Browsers play the first source they support, so smaller formats should come first."""
+
+
+POSTER_SUFFIX: str = ".poster.png"
+"The suffix of the poster image the build script writes next to each video."
+
+IMAGE_SUFFIXES: Dict[str, str] = {"still": ".still.svg", "vector": ".svg"}
+"""Maps each option which embeds an svg instead of a video to the suffix of the svg, which build --<option> writes
+next to each video."""
+
+ANIMATION_INDEX_NAME: str = "animation_index.json"
+"The name of the index of the documents embedding each scene in the doctree directory."
+
+static_path: Path = Path(__file__).parent / "static"
+"The directory containing the scripts bundled with the extension."
+
 
 def size(argument: str):
     return docutils_directives.choice(argument, ("standard", "small"))
 
 
+def preload(argument: str):
+    return docutils_directives.choice(argument, ("none", "metadata", "auto"))
+
+
 class Animation(sphinx_docutils.SphinxDirective):
     """Animation directive.
     Wrapper for the html <video> tag embeding all the supported options.
@@ -43,9 +71,17 @@ class Animation(sphinx_docutils.SphinxDirective):
     option_spec: typing.OptionSpec = {
         "autoplay": docutils_directives.flag,
         "size": size,
+        "preload": preload,
+        "vector": docutils_directives.flag,
+        "still": docutils_directives.flag,
     }
 
     def run(self) -> List[nodes.Node]:
+        # includes parsing the caption
+        with timing.measure("Animation.run", self.env.docname):
+            return self._make_figure()
+
+    def _make_figure(self) -> List[nodes.Node]:
         uri = self._parse_uri()
 
         figure_node = nodes.figure(
@@ -53,24 +89,41 @@ class Animation(sphinx_docutils.SphinxDirective):
             align="center",  # may also be left or right
         )
 
+        image_uri = self._find_image(uri)
+        if image_uri is not None:
+            # animated svgs loop on their own, so they're embedded as a plain image like stills
+            figure_node += nodes.image(
+                rawsource=self.block_text,
+                uri=image_uri,
+                alt=self._get_stem(uri).name,
+                width=self._parse_width(),
+            )
+            return [self._add_caption(figure_node)]
+
         video_node = video.video(
             # add entire directive for error handling
             rawsource=self.block_text,
-            src=uri,
             width=self._parse_width(),
-            autoplay=("autoplay" in self.options),
             loop=("autoplay" in self.options),
             controls=True,
             playsinline=True,
             muted=True,
             disablepictureinpicture=True,
+            preload=self._parse_preload(),
         )
-
-        # optional - use source nodes to support multiple sources
-        # source_node = video.source(
-        #     rawsource=self.arguments[0], src=uri, type="video/mp4"
-        # )
-        # video_node += source_node
+        if "autoplay" in self.options:
+            # autoplay.js plays the video while it's visible, so it isn't loaded until it's scrolled into view
+            video_node["data-autoplay"] = True
+
+        poster_uri = self._find_poster(uri)
+        if poster_uri is not None:
+            video_node["poster"] = poster_uri
+
+        # the browser plays the first source it supports
+        for source_uri, mime_type in self._find_sources(uri):
+            video_node += video.source(
+                rawsource=self.arguments[0], src=source_uri, type=mime_type
+            )
 
         # Add caption
         figure_node += video_node
@@ -84,6 +137,67 @@ class Animation(sphinx_docutils.SphinxDirective):
             self.options["size"] if "size" in self.options else "standard"
         ]
 
+    def _parse_preload(self) -> str:
+        """Videos only fetch their metadata until they are played. Autoplay videos fetch nothing until visible."""
+        if "preload" in self.options:
+            return self.options["preload"]
+        return "none" if "autoplay" in self.options else "metadata"
+
+    def _exists(self, uri: str) -> bool:
+        image_uri, abs_path = self.env.relfn2path(uri, self.env.docname)
+        if Path(abs_path).exists():
+            return True
+        # the file may be rendered or published after the document is read, which must then be read again
+        video.note_missing_media(self.env, image_uri)
+        return False
+
+    def _get_stem(self, uri: str) -> Path:
+        """Returns uri without its video format suffix, e.g. media/IntakePlateScene."""
+        path = Path(uri)
+        for suffix, _ in SOURCE_FORMATS:
+            if path.name.endswith(suffix):
+                return path.with_name(path.name.removesuffix(suffix))
+        return path.with_suffix("")
+
+    def _find_sources(self, uri: str) -> List[Tuple[str, str]]:
+        """Returns the uri and mime type of each format of the video at uri which exists, best first.
+
+        The video at uri is always included, even if no other formats exist.
+        """
+        stem = self._get_stem(uri)
+        sources: List[Tuple[str, str]] = []
+        for suffix, mime_type in SOURCE_FORMATS:
+            source_uri = str(stem.with_name(stem.name + suffix))
+            if source_uri == uri or self._exists(source_uri):
+                sources.append((source_uri, mime_type))
+        return sources
+
+    def _find_poster(self, uri: str) -> str | None:
+        """Returns the uri of the poster written next to the video at uri by the build script, if it exists."""
+        stem = self._get_stem(uri)
+        poster_uri = str(stem.with_name(stem.name + POSTER_SUFFIX))
+        return poster_uri if self._exists(poster_uri) else None
+
+    def _find_image(self, uri: str) -> str | None:
+        """Returns the uri of the svg to embed instead of the video at uri, or None if the video should be embedded.
+
+        The svg is chosen by the still or vector option, and is written next to the video by build --still or
+        build --vector respectively.
+        """
+        stem = self._get_stem(uri)
+        for option, suffix in IMAGE_SUFFIXES.items():
+            if option not in self.options:
+                continue
+            image_uri = str(stem.with_name(stem.name + suffix))
+            if self._exists(image_uri):
+                return image_uri
+            logger.warning(
+                "{} has no {} export (run build --{}), embedding its video instead".format(
+                    uri, option, option
+                )
+            )
+        return None
+
     def _parse_uri(self) -> str:
         path = Path(self.arguments[0])
         if len(path.parts) == 1:
@@ -130,13 +244,101 @@ class Animation(sphinx_docutils.SphinxDirective):
         return error
 
 
+class AnimationCollector(collectors.EnvironmentCollector):
+    """Records the videos embedded by each document, which are used to build the animation index."""
+
+    def clear_doc(
+        self, app: application.Sphinx, env: environment.BuildEnvironment, docname: str
+    ) -> None:
+        _get_document_videos(env).pop(docname, None)
+
+    def merge_other(
+        self,
+        app: application.Sphinx,
+        env: environment.BuildEnvironment,
+        docnames: set[str],
+        other: environment.BuildEnvironment,
+    ) -> None:
+        videos = _get_document_videos(env)
+        other_videos = _get_document_videos(other)
+        for docname in docnames:
+            if docname in other_videos:
+                videos[docname] = other_videos[docname]
+
+    def process_doc(self, app: application.Sphinx, doctree: nodes.document) -> None:
+        paths = video.find_mp4_paths(doctree)
+        if paths:
+            _get_document_videos(app.env)[app.env.docname] = sorted(paths)
+
+
+def _get_document_videos(env: environment.BuildEnvironment) -> Dict[str, List[str]]:
+    """Returns the videos (relative to the source directory) embedded by each document."""
+    if not hasattr(env, "animation_videos"):
+        env.animation_videos = {}  # type: ignore
+    return env.animation_videos  # type: ignore
+
+
+def make_animation_index(
+    app: application.Sphinx,
+) -> Dict[str, Dict[str, List[str]]]:
+    """Returns a mapping of each scene to its video to the documents embedding it.
+
+    Paths are relative to the repository, e.g.
+    {"IntakePlateScene": {"website/design/plate/media/IntakePlateScene.mp4": ["website/design/plate/plate.md"]}}.
+    """
+    repository_path = Path(app.srcdir).parent
+    index: Dict[str, Dict[str, List[str]]] = {}
+    for docname, paths in sorted(_get_document_videos(app.env).items()):
+        document = str(Path(app.env.doc2path(docname)).relative_to(repository_path))
+        for path in paths:
+            video_path = str(Path(app.srcdir, path).relative_to(repository_path))
+            scene_name = Path(path).name.partition(".")[0]
+            index.setdefault(scene_name, {}).setdefault(video_path, []).append(document)
+    return index
+
+
+def write_animation_index(app: application.Sphinx, exception: Exception | None) -> None:
+    """Writes the animation index to the doctree directory, where the build script reads it."""
+    if exception is not None:
+        return
+    path = Path(app.doctreedir, ANIMATION_INDEX_NAME)
+    path.write_text(json.dumps(make_animation_index(app), indent=4))
+
+
+def get_changed_documents(
+    app: application.Sphinx,
+    env: environment.BuildEnvironment,
+    added: set[str],
+    changed: set[str],
+    removed: set[str],
+) -> List[str]:
+    """Returns the documents build -m found embedding the scenes it re-rendered, which are always read again."""
+    return list(app.config.animation_changed_documents)
+
+
+def add_static_path(app: application.Sphinx) -> None:
+    app.config.html_static_path.append(str(static_path))
+
+
 def setup(app: application.Sphinx) -> Dict[str, bool]:
     """Add video node and parameters to the Sphinx builder."""
+    timing.register_timing(app)
     video.register_video_nodes(app)
+    render.register_render_queue(app)
 
     app.add_directive("animation", Animation)
 
+    # registered after the video collector, which resolves the path of each video first
+    app.add_env_collector(AnimationCollector)
+    app.connect("build-finished", write_animation_index)
+    app.add_config_value("animation_changed_documents", [], "", list)
+    app.connect("env-get-outdated", get_changed_documents)
+
+    app.connect("builder-inited", add_static_path)
+    weight.register_page_weight(app)
+    app.add_js_file("autoplay.js", loading_method="defer")
+
     return {
         "parallel_read_safe": True,
-        "parallel_read_write": True,
+        "parallel_write_safe": True,
     }
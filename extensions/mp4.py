@@ -0,0 +1,109 @@
+"""
+A minimal parser of the mp4 boxes which describe the dimensions and duration of a video.
+
+Only the moov box is read, so probing a video is cheap regardless of its size (and doesn't require ffprobe).
+Box layouts are described in ISO/IEC 14496-12.
+"""
+
+from typing import BinaryIO, Iterator, NamedTuple
+
+import pathlib
+import struct
+
+
+class VideoInfo(NamedTuple):
+    width: int
+    height: int
+    duration: float
+    "The duration of the video in seconds."
+
+
+def _read_header(data: bytes, offset: int, end: int) -> tuple[bytes, int, int]:
+    """Returns the type, payload offset, and end offset of the box at offset."""
+    size, box_type = struct.unpack_from(">I4s", data, offset)
+    header_size = 8
+    if size == 1:
+        (size,) = struct.unpack_from(">Q", data, offset + 8)
+        header_size = 16
+    elif size == 0:
+        size = end - offset
+    if size < header_size or offset + size > end:
+        raise ValueError("Invalid {} box".format(box_type))
+    return box_type, offset + header_size, offset + size
+
+
+def _iter_boxes(data: bytes, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    offset = start
+    while offset + 8 <= end:
+        box_type, payload, box_end = _read_header(data, offset, end)
+        yield box_type, payload, box_end
+        offset = box_end
+
+
+def _find_box(data: bytes, start: int, end: int, box_type: bytes) -> tuple[int, int]:
+    for found_type, payload, box_end in _iter_boxes(data, start, end):
+        if found_type == box_type:
+            return payload, box_end
+    raise ValueError("Missing {} box".format(box_type))
+
+
+def _read_moov(file: BinaryIO) -> bytes:
+    """Returns the contents of the top level moov box, which may be at the start or the end of the file."""
+    while header := file.read(8):
+        if len(header) < 8:
+            break
+        size, box_type = struct.unpack(">I4s", header)
+        header_size = 8
+        if size == 1:
+            (size,) = struct.unpack(">Q", file.read(8))
+            header_size = 16
+        if box_type == b"moov":
+            if size == 0:
+                return file.read()
+            return file.read(size - header_size)
+        if size == 0:
+            break
+        file.seek(size - header_size, 1)
+    raise ValueError("Missing moov box")
+
+
+def _parse_duration(data: bytes, payload: int) -> float:
+    """Returns the duration stored in an mvhd box in seconds."""
+    version = data[payload]
+    if version == 1:
+        timescale, duration = struct.unpack_from(">IQ", data, payload + 20)
+    else:
+        timescale, duration = struct.unpack_from(">II", data, payload + 12)
+    return duration / timescale
+
+
+def _parse_dimensions(data: bytes, payload: int) -> tuple[int, int]:
+    """Returns the width and height stored (as 16.16 fixed point numbers) in a tkhd box."""
+    version = data[payload]
+    # version, flags, times, track id, reserved, and duration, followed by reserved, layer, group, volume, matrix
+    offset = payload + (36 if version == 1 else 24) + 52
+    width, height = struct.unpack_from(">II", data, offset)
+    return width >> 16, height >> 16
+
+
+def _is_video_track(data: bytes, start: int, end: int) -> bool:
+    mdia, mdia_end = _find_box(data, start, end, b"mdia")
+    hdlr, _ = _find_box(data, mdia, mdia_end, b"hdlr")
+    # version, flags, and pre_defined precede the handler type
+    return data[hdlr + 8 : hdlr + 12] == b"vide"
+
+
+def probe(path: pathlib.Path) -> VideoInfo:
+    """Returns the dimensions and duration of the mp4 video at path. Raises ValueError if path isn't a valid mp4."""
+    with open(path, "rb") as file:
+        data = _read_moov(file)
+    try:
+        mvhd, _ = _find_box(data, 0, len(data), b"mvhd")
+        duration = _parse_duration(data, mvhd)
+        for box_type, payload, box_end in _iter_boxes(data, 0, len(data)):
+            if box_type == b"trak" and _is_video_track(data, payload, box_end):
+                tkhd, _ = _find_box(data, payload, box_end, b"tkhd")
+                return VideoInfo(*_parse_dimensions(data, tkhd), duration)
+    except struct.error as error:
+        raise ValueError("Truncated box in {}".format(path)) from error
+    raise ValueError("No video track in {}".format(path))
@@ -0,0 +1,137 @@
+"""
+Publishes files into the output directory without copying their bytes where the filesystem allows it.
+
+Videos are the largest files in the website, so instead of copying them on every build they are reflinked
+(a copy-on-write clone) or hardlinked into the output directory, falling back to a regular copy. Files whose
+published version already has the same content are skipped entirely.
+"""
+
+import enum
+import hashlib
+import os
+import pathlib
+import re
+import shutil
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from library.render import cache
+
+FICLONE: int = 0x40049409
+"The linux ioctl which reflinks one file to another (on filesystems such as btrfs and xfs)."
+
+_CHUNK_SIZE: int = 1024 * 1024
+
+FINGERPRINT_LENGTH: int = 8
+"The number of hex digits of the content hash included in fingerprinted file names."
+
+
+class Method(enum.Enum):
+    SKIPPED = "skipped"
+    REFLINK = "reflink"
+    HARDLINK = "hardlink"
+    COPY = "copy"
+
+
+def hash_file(path: pathlib.Path) -> str:
+    """Returns the sha256 hash of the contents of path."""
+    hasher = hashlib.sha256()
+    with open(path, "rb") as file:
+        while chunk := file.read(_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def fingerprint_name(path: pathlib.PurePath, digest: str) -> str:
+    """Returns the name of path with a short prefix of digest (the hash of its contents) inserted before its suffixes.
+
+    For example, media/IntakePlateScene.mp4 becomes IntakePlateScene.3f9a1c2b.mp4. Files with the same name and
+    contents get the same fingerprinted name, so they are only published once.
+    """
+    short_digest = digest[:FINGERPRINT_LENGTH]
+    stem, _, suffixes = path.name.partition(".")
+    return (
+        "{}.{}.{}".format(stem, short_digest, suffixes)
+        if suffixes
+        else "{}.{}".format(stem, short_digest)
+    )
+
+
+def is_fingerprinted(name: str) -> bool:
+    """Returns True if name is a fingerprinted file name returned by fingerprint_name."""
+    parts = name.split(".")
+    return (
+        len(parts) > 1
+        and re.fullmatch("[0-9a-f]{{{}}}".format(FINGERPRINT_LENGTH), parts[1])
+        is not None
+    )
+
+
+def is_up_to_date(source: pathlib.Path, target: pathlib.Path) -> bool:
+    """Returns True if target has the same contents as source.
+
+    Sizes and hashes are compared rather than modification times, which change whenever a video is re-rendered.
+    """
+    if not target.exists():
+        return False
+    if os.path.samefile(source, target):
+        return True
+    if source.stat().st_size != target.stat().st_size:
+        return False
+    return hash_file(source) == hash_file(target)
+
+
+def _reflink(source: pathlib.Path, target: str) -> None:
+    if fcntl is None:
+        raise OSError("Reflinks require fcntl, which isn't available on this platform")
+    with open(source, "rb") as source_file, open(target, "wb") as target_file:
+        fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+
+
+def _link(source: pathlib.Path, target: str) -> Method:
+    try:
+        _reflink(source, target)
+        # the temporary file is only readable by its owner
+        os.chmod(target, cache.default_file_mode())
+        return Method.REFLINK
+    except OSError:
+        pass
+    os.unlink(target)
+    try:
+        # hardlinks share the mode of source
+        os.link(source, target)
+        return Method.HARDLINK
+    except OSError:
+        pass
+    shutil.copyfile(source, target)
+    os.chmod(target, cache.default_file_mode())
+    return Method.COPY
+
+
+def publish_file(source: pathlib.Path, target: pathlib.Path) -> Method:
+    """Publishes source to target, preferring a reflink, then a hardlink, then a copy.
+
+    Hardlinks share their contents with source, so source must be replaced (e.g. by an atomic rename) rather than
+    modified in place. The build script always does this.
+    """
+    if is_up_to_date(source, target):
+        return Method.SKIPPED
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # link to a temporary name and rename so the target is never missing or partially written
+    descriptor, temp_path = tempfile.mkstemp(
+        dir=target.parent, prefix=".{}.".format(target.name)
+    )
+    os.close(descriptor)
+    try:
+        method = _link(source, temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return method
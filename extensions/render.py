@@ -0,0 +1,174 @@
+"""
+Renders the videos referenced by the website on demand.
+
+Whenever a document is read, the videos of its animations are queued with the build script (build.py --videos),
+which maps each video back to its scene and renders the scenes whose videos are missing or out of date. Rendering
+runs in the background while sphinx continues reading, and the build waits for every render to finish before
+writing any pages. A fresh checkout therefore only renders the videos the website actually uses.
+
+Editing a scene doesn't change the documents embedding it, so the videos of the documents which aren't read are
+queued as well. The documents whose videos are re-rendered are written again (see video.VideoCollector).
+
+Set animation_render = False in conf.py (or pass -D animation_render=0) to disable rendering.
+"""
+
+from typing import Iterable
+
+import os
+import pathlib
+import subprocess
+import sys
+
+from docutils import nodes
+from sphinx import application, environment
+from sphinx.environment import collectors
+from sphinx.util import logging
+
+from extensions import video
+
+logger = logging.getLogger(__name__)
+
+
+class RenderQueue:
+    """Runs the build script on batches of videos, one batch at a time.
+
+    Videos submitted while a batch is running are rendered by the next batch, so only one build script (and its
+    memory budget) is ever running.
+    """
+
+    def __init__(self, repository_path: pathlib.Path, arguments: list[str]) -> None:
+        self._repository_path = repository_path
+        self._arguments = arguments
+        self._pid = os.getpid()
+        self._requested: set[str] = set()
+        self._pending: set[str] = set()
+        self._process: subprocess.Popen | None = None
+
+    def is_owner(self) -> bool:
+        """Returns True if this is the process which created the queue (rather than a parallel reader)."""
+        return os.getpid() == self._pid
+
+    def submit(self, video_paths: Iterable[str]) -> None:
+        """Queues videos (relative to the repository) which haven't been queued before."""
+        new_paths = set(video_paths) - self._requested
+        self._requested.update(new_paths)
+        self._pending.update(new_paths)
+        self._poll()
+
+    def wait(self) -> None:
+        """Waits for every queued video to be rendered."""
+        while self._process is not None or self._pending:
+            if self._process is not None:
+                self._process.wait()
+            self._poll()
+
+    def _poll(self) -> None:
+        if self._process is not None:
+            returncode = self._process.poll()
+            if returncode is None:
+                return
+            if returncode != 0:
+                logger.warning("failed to render some videos, see the output above")
+            self._process = None
+
+        if not self._pending:
+            return
+        command = [
+            sys.executable,
+            "-m",
+            "build",
+            *self._arguments,
+            "--videos",
+            *sorted(self._pending),
+        ]
+        logger.info(
+            "checking {} videos for rendering in the background".format(
+                len(self._pending)
+            )
+        )
+        self._pending.clear()
+        self._process = subprocess.Popen(command, cwd=self._repository_path)
+
+
+_queue: RenderQueue | None = None
+"The render queue of the current build, or None if rendering is disabled."
+
+
+def _get_repository_paths(app: application.Sphinx, paths: Iterable[str]) -> set[str]:
+    """Returns paths (relative to the source directory) relative to the repository."""
+    return set(
+        str(pathlib.Path(app.srcdir).name / pathlib.Path(path)) for path in paths
+    )
+
+
+def _find_videos(app: application.Sphinx, doctree: nodes.document) -> set[str]:
+    """Returns the path (relative to the repository) of each mp4 referenced by doctree."""
+    return _get_repository_paths(app, video.find_mp4_paths(doctree))
+
+
+class RenderCollector(collectors.EnvironmentCollector):
+    def clear_doc(
+        self, app: application.Sphinx, env: environment.BuildEnvironment, docname: str
+    ) -> None:
+        pass
+
+    def merge_other(
+        self,
+        app: application.Sphinx,
+        env: environment.BuildEnvironment,
+        docnames: set[str],
+        other: environment.BuildEnvironment,
+    ) -> None:
+        # the videos found by a parallel reader are queued as soon as its documents are merged
+        if _queue is not None:
+            _queue.submit(getattr(other, "video_render_requests", set()))
+
+    def process_doc(self, app: application.Sphinx, doctree: nodes.document) -> None:
+        if _queue is None:
+            return
+        videos = _find_videos(app, doctree)
+        if _queue.is_owner():
+            _queue.submit(videos)
+        else:
+            # parallel readers can't start renders, so their videos are queued by merge_other
+            env = app.env
+            env.video_render_requests = (  # type: ignore
+                getattr(env, "video_render_requests", set()) | videos
+            )
+
+
+def start_queue(
+    app: application.Sphinx, env: environment.BuildEnvironment, docnames: list[str]
+) -> None:
+    global _queue
+    env.video_render_requests = set()  # type: ignore
+    if not app.config.animation_render:
+        _queue = None
+        return
+    arguments = ["-j", str(max(1, app.parallel))]
+    if app.config.animation_render_production:
+        arguments.append("--production")
+    _queue = RenderQueue(pathlib.Path(app.srcdir).parent, arguments)
+    # the build script only renders the videos whose scenes changed since they were published
+    _queue.submit(
+        _get_repository_paths(app, video.get_recorded_mp4_paths(env, set(docnames)))
+    )
+
+
+def wait_for_queue(app: application.Sphinx, env: environment.BuildEnvironment) -> None:
+    if _queue is not None:
+        _queue.wait()
+
+
+def register_render_queue(app: application.Sphinx) -> None:
+    """Registers the render queue with sphinx.
+
+    Must be called after video.register_video_nodes, since the collector relies on the video collector resolving the
+    path of each video first.
+    """
+    app.add_config_value("animation_render", True, "")
+    app.add_config_value("animation_render_production", False, "")
+    app.add_env_collector(RenderCollector)
+    app.connect("env-before-read-docs", start_queue)
+    # env-updated is emitted after every document has been read and before any are written
+    app.connect("env-updated", wait_for_queue)
@@ -0,0 +1,33 @@
+/**
+ * Plays autoplay animations only while they are visible.
+ *
+ * Autoplay videos are emitted with data-autoplay (rather than autoplay) and preload="none", so browsers don't
+ * download or decode them until they are scrolled into view.
+ */
+"use strict";
+
+document.addEventListener("DOMContentLoaded", () => {
+  const videos = document.querySelectorAll("video[data-autoplay]");
+  if (!("IntersectionObserver" in window)) {
+    videos.forEach((video) => {
+      video.autoplay = true;
+      video.play().catch(() => {});
+    });
+    return;
+  }
+
+  const observer = new IntersectionObserver(
+    (entries) => {
+      entries.forEach((entry) => {
+        if (entry.isIntersecting) {
+          // play is rejected if the browser blocks autoplay; the controls still work
+          entry.target.play().catch(() => {});
+        } else {
+          entry.target.pause();
+        }
+      });
+    },
+    { threshold: 0.25 },
+  );
+  videos.forEach((video) => observer.observe(video));
+});
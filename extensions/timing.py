@@ -0,0 +1,111 @@
+"""
+Optional instrumentation which records the time spent in the animation and video extensions.
+
+Timing is enabled by setting animation_timing = True in conf.py (or passing -D animation_timing=1). Parallel
+readers and writers can't return data to the main process, so every process appends its measurements to its own
+file in the doctree directory. The measurements are totalled by stage and document once the build finishes, written
+to animation_timing.json in the doctree directory, and summarized in the build log.
+"""
+
+from typing import Iterator
+
+import contextlib
+import json
+import os
+import pathlib
+import shutil
+import time
+
+from sphinx import application
+from sphinx.util import logging
+
+logger = logging.getLogger(__name__)
+
+REPORT_NAME: str = "animation_timing.json"
+"The name of the timing report in the doctree directory."
+
+TOP_DOCUMENTS: int = 5
+"The number of most expensive documents included in the build log."
+
+_directory: pathlib.Path | None = None
+"The directory measurements are written to, or None if timing is disabled."
+
+
+def _get_measurement_path() -> pathlib.Path:
+    assert _directory is not None
+    return _directory / "{}.jsonl".format(os.getpid())
+
+
+@contextlib.contextmanager
+def measure(stage: str, docname: str) -> Iterator[None]:
+    """Records the time spent inside the context under stage and docname. Does nothing if timing is disabled."""
+    if _directory is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with open(_get_measurement_path(), "a") as file:
+            file.write(json.dumps([stage, docname, elapsed]) + "\n")
+
+
+def start_timing(app: application.Sphinx) -> None:
+    global _directory
+    if not app.config.animation_timing:
+        _directory = None
+        return
+    _directory = pathlib.Path(app.doctreedir, "animation_timing")
+    shutil.rmtree(_directory, ignore_errors=True)
+    _directory.mkdir(parents=True)
+
+
+def make_report(directory: pathlib.Path) -> dict:
+    """Returns the total time and calls of each stage, along with the time each document spent in each stage."""
+    stages: dict[str, dict] = {}
+    for path in directory.glob("*.jsonl"):
+        for line in path.read_text().splitlines():
+            stage, docname, elapsed = json.loads(line)
+            stats = stages.setdefault(stage, {"calls": 0, "time": 0, "documents": {}})
+            stats["calls"] += 1
+            stats["time"] += elapsed
+            stats["documents"][docname] = stats["documents"].get(docname, 0) + elapsed
+    return dict(sorted(stages.items(), key=lambda item: -item[1]["time"]))
+
+
+def format_report(report: dict) -> str:
+    """Returns a report returned by make_report as a table."""
+    lines = ["{:<40} {:>8} {:>9}".format("stage", "calls", "time")]
+    documents: dict[str, float] = {}
+    for stage, stats in report.items():
+        lines.append(
+            "{:<40} {:>8} {:>8.3f}s".format(stage, stats["calls"], stats["time"])
+        )
+        for docname, elapsed in stats["documents"].items():
+            documents[docname] = documents.get(docname, 0) + elapsed
+
+    lines.append("")
+    lines.append("{:<40} {:>18}".format("document", "time"))
+    for docname, elapsed in sorted(documents.items(), key=lambda item: -item[1])[
+        :TOP_DOCUMENTS
+    ]:
+        lines.append("{:<40} {:>17.3f}s".format(docname, elapsed))
+    return "\n".join(lines)
+
+
+def write_report(app: application.Sphinx, exception: Exception | None) -> None:
+    """Totals the measurements of every process and writes the timing report."""
+    if _directory is None or exception is not None:
+        return
+    report = make_report(_directory)
+    shutil.rmtree(_directory, ignore_errors=True)
+    pathlib.Path(app.doctreedir, REPORT_NAME).write_text(json.dumps(report, indent=4))
+    logger.info("time spent in the animation extensions:\n" + format_report(report))
+
+
+def register_timing(app: application.Sphinx) -> None:
+    """Registers extension timing with sphinx."""
+    app.add_config_value("animation_timing", False, "")
+    app.connect("builder-inited", start_timing)
+    app.connect("build-finished", write_report)
@@ -9,8 +9,10 @@ image directive source code:
 https://github.com/docutils/docutils/blob/master/docutils/docutils/parsers/rst/directives/images.py
 """
 
-from typing import List
+from typing import List, NamedTuple, cast
 
+import collections
+import json
 import pathlib
 
 from docutils import nodes
@@ -19,6 +21,11 @@ from sphinx.writers import html as html_writers
 from sphinx import application, environment
 from sphinx.builders import html as html_builders
 from sphinx.environment import collectors
+from sphinx.util import logging, display
+
+from extensions import publish, mp4, timing
+
+logger = logging.getLogger(__name__)
 
 
 class source(nodes.Inline, nodes.Element):
@@ -56,11 +63,102 @@ https://github.com/sphinx-doc/sphinx/blob/ff852bc7c31f48e66100e4647749fc199d92ca
 """
 
 
+MEDIA_ATTRIBUTES: List[str] = ["src", "poster"]
+"The attributes of video and source nodes which reference a file."
+
+
+def find_media_nodes(doctree: nodes.Node) -> List[nodes.Element]:
+    """Returns every video and source node in doctree which references a file."""
+    return [
+        node
+        for node in list(doctree.findall(video)) + list(doctree.findall(source))
+        if any(attribute in node for attribute in MEDIA_ATTRIBUTES)
+    ]
+
+
+def get_media_paths(node: nodes.Element) -> List[str]:
+    """Returns the path of each file referenced by a video or source node."""
+    return [node[attribute] for attribute in MEDIA_ATTRIBUTES if attribute in node]
+
+
+def find_mp4_paths(doctree: nodes.Node) -> set[str]:
+    """Returns the path of each mp4 referenced by doctree.
+
+    Paths are relative to the source directory once the video collector has processed doctree.
+    """
+    return set(
+        path
+        for node in find_media_nodes(doctree)
+        for path in get_media_paths(node)
+        if path.endswith(".mp4")
+    )
+
+
+MANIFEST_NAME: str = "videos.json"
+"The name of the manifest of published videos in the output directory."
+
+VIDEO_INFO_NAME: str = "video_info.json"
+"The name of the cache of the dimensions and duration of each video in the doctree directory."
+
+
+class MediaRecord(NamedTuple):
+    """The size, modification time, and content hash of a video when its document was read."""
+
+    size: int
+    mtime: int
+    digest: str
+
+
+def _stat(path: pathlib.Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _make_record(path: pathlib.Path) -> MediaRecord | None:
+    """Returns the record of the file at path, or None if it doesn't exist."""
+    stat = _stat(path)
+    if stat is None:
+        return None
+    return MediaRecord(*stat, publish.hash_file(path))
+
+
+def note_missing_media(env: environment.BuildEnvironment, image_uri: str) -> None:
+    """Records a file the document being read would embed if it existed, such as a poster which hasn't been rendered.
+
+    image_uri is relative to the source directory. The document is read again once the file is added.
+    """
+    _get_missing_media(env).setdefault(env.docname, set()).add(image_uri)
+
+
 class VideoCollector(collectors.EnvironmentCollector):
+    """Collects the videos of each document.
+
+    Rather than adding videos to env.dependencies (which compares modification times), the content hash of each
+    video is recorded, and a document is only re-read when the contents of one of its videos change. Re-rendering a
+    scene into identical bytes (e.g. from the render cache) therefore doesn't rebuild any pages.
+
+    Files a document would embed if they existed (see note_missing_media) are tracked separately, since they change
+    the document itself rather than just its videos. Their records are never refreshed after the document is read,
+    so a poster rendered during the build still re-reads the document on the next build.
+    """
+
+    def enable(self, app: application.Sphinx) -> None:
+        super().enable(app)
+        self._read_docnames: set[str] = set()
+        # runs after the render queue has finished, so videos rendered during the build are recorded
+        self.listener_ids["env-updated"] = app.connect(  # type: ignore
+            "env-updated", self.update_records, priority=900
+        )
+
     def clear_doc(
         self, app: application.Sphinx, env: environment.BuildEnvironment, docname: str
     ) -> None:
         env.images.purge_doc(docname)
+        _get_media_records(env).pop(docname, None)
+        _get_missing_media(env).pop(docname, None)
 
     def merge_other(
         self,
@@ -68,41 +166,334 @@ class VideoCollector(collectors.EnvironmentCollector):
         env: environment.BuildEnvironment,
         docnames: set[str],
         other: environment.BuildEnvironment,
+    ) -> None:
+        with timing.measure("VideoCollector.merge_other", "(merge)"):
+            self._merge_other(env, docnames, other)
+
+    def _merge_other(
+        self,
+        env: environment.BuildEnvironment,
+        docnames: set[str],
+        other: environment.BuildEnvironment,
     ) -> None:
         env.images.merge_other(docnames, other.images)
+        records = _get_media_records(env)
+        other_records = _get_media_records(other)
+        missing = _get_missing_media(env)
+        other_missing = _get_missing_media(other)
+        for docname in docnames:
+            if docname in other_records:
+                records[docname] = other_records[docname]
+            if docname in other_missing:
+                missing[docname] = other_missing[docname]
+        self._read_docnames.update(docnames)
 
     def process_doc(self, app: application.Sphinx, doctree: nodes.document) -> None:
-        for node in list(doctree.findall(video)) + list(doctree.findall(source)):
-            docname = app.env.docname
-            image_uri, _ = app.env.relfn2path(node["src"], docname)
-            node["src"] = image_uri
-            app.env.dependencies[docname].add(image_uri)
-            app.env.images.add_file(docname, image_uri)
+        with timing.measure("VideoCollector.process_doc", app.env.docname):
+            self._process_doc(app, doctree)
+
+    def _process_doc(self, app: application.Sphinx, doctree: nodes.document) -> None:
+        docname = app.env.docname
+        records: dict[str, MediaRecord | None] = {}
+        for node in find_media_nodes(doctree):
+            for attribute in MEDIA_ATTRIBUTES:
+                if attribute not in node:
+                    continue
+                image_uri, abs_path = app.env.relfn2path(node[attribute], docname)
+                node[attribute] = image_uri
+                app.env.images.add_file(docname, image_uri)
+                records[image_uri] = _make_record(pathlib.Path(abs_path))
+        if records:
+            _get_media_records(app.env)[docname] = records
+        self._read_docnames.add(docname)
+
+    def get_outdated_docs(
+        self,
+        app: application.Sphinx,
+        env: environment.BuildEnvironment,
+        added: set[str],
+        changed: set[str],
+        removed: set[str],
+    ) -> List[str]:
+        """Returns the documents whose videos changed, or which would embed a file added since they were read."""
+        outdated: List[str] = [
+            docname
+            for docname, image_uris in _get_missing_media(env).items()
+            if docname not in changed
+            and docname not in removed
+            and any(pathlib.Path(app.srcdir, uri).exists() for uri in image_uris)
+        ]
+        for docname, records in _get_media_records(env).items():
+            if docname in changed or docname in removed:
+                continue
+            for image_uri, record in list(records.items()):
+                path = pathlib.Path(app.srcdir, image_uri)
+                stat = _stat(path)
+                if record is None or stat is None:
+                    if record is not None or stat is not None:
+                        outdated.append(docname)
+                        break
+                    continue
+                if stat == (record.size, record.mtime):
+                    continue
+                digest = publish.hash_file(path)
+                if digest != record.digest:
+                    outdated.append(docname)
+                    break
+                # same contents; remember the new modification time so the file isn't hashed again
+                records[image_uri] = MediaRecord(*stat, digest)
+        return outdated
+
+    def update_records(
+        self, app: application.Sphinx, env: environment.BuildEnvironment
+    ) -> List[str]:
+        """Updates the records of videos which were rendered after their documents were read or checked.
+
+        Returns the documents which weren't read this build but whose videos changed (e.g. because their scene was
+        edited), which sphinx then writes again.
+        """
+        changed: set[str] = set()
+        for docname, records in _get_media_records(env).items():
+            was_read = docname in self._read_docnames
+            for image_uri, record in records.items():
+                path = pathlib.Path(app.srcdir, image_uri)
+                stat = _stat(path)
+                if stat is None or (record is not None and stat == record[:2]):
+                    continue
+                # files added to documents which weren't read are left to get_outdated_docs, which reads them again
+                if not was_read and record is None:
+                    continue
+                new_record = _make_record(path)
+                records[image_uri] = new_record
+                if not was_read and new_record is not None and new_record != record:
+                    changed.add(docname)
+        self._read_docnames.clear()
+        return sorted(changed)
+
+
+def _get_media_records(
+    env: environment.BuildEnvironment,
+) -> dict[str, dict[str, MediaRecord | None]]:
+    """Returns the media records of each document, which are stored in the environment."""
+    if not hasattr(env, "video_media_records"):
+        env.video_media_records = {}  # type: ignore
+    return env.video_media_records  # type: ignore
+
+
+def get_recorded_mp4_paths(
+    env: environment.BuildEnvironment, skipped: set[str]
+) -> set[str]:
+    """Returns the path (relative to the source directory) of each mp4 embedded by documents other than skipped.
+
+    The paths are those recorded when each document was last read.
+    """
+    return set(
+        image_uri
+        for docname, records in _get_media_records(env).items()
+        if docname not in skipped
+        for image_uri in records
+        if image_uri.endswith(".mp4")
+    )
+
+
+def _get_missing_media(env: environment.BuildEnvironment) -> dict[str, set[str]]:
+    """Returns the files each document would embed if they existed, which are stored in the environment."""
+    if not hasattr(env, "video_missing_media"):
+        env.video_missing_media = {}  # type: ignore
+    return env.video_missing_media  # type: ignore
 
 
 class VideoBuilder(html_builders.StandaloneHTMLBuilder):
+    def init(self) -> None:
+        super().init()
+        self.videos: dict[str, str] = {}
+        "Maps the source path of each video to its fingerprinted file name in the images directory."
+        self._digests: dict[str, str | None] = {}
+        self._video_info: dict[str, mp4.VideoInfo] = self._load_video_info()
+        "Maps the content hash of each probed video to its dimensions and duration."
+
+    def get_digest(self, src: str) -> str | None:
+        """Returns the content hash of the file at src, or None if it can't be read."""
+        if src not in self._digests:
+            try:
+                self._digests[src] = publish.hash_file(pathlib.Path(self.srcdir, src))
+            except OSError as error:
+                logger.warning("cannot read video file {}: {}".format(src, error))
+                self._digests[src] = None
+        return self._digests[src]
+
+    def get_video_name(self, src: str) -> str:
+        """Returns the fingerprinted name of the video at src, e.g. IntakePlateScene.3f9a1c2b.mp4."""
+        if src not in self.videos:
+            digest = self.get_digest(src)
+            path = pathlib.PurePath(src)
+            self.videos[src] = (
+                path.name if digest is None else publish.fingerprint_name(path, digest)
+            )
+        return self.videos[src]
+
+    def get_video_info(self, src: str) -> mp4.VideoInfo | None:
+        """Returns the dimensions and duration of the mp4 at src, or None if it can't be probed.
+
+        Results are cached by content hash, so each video is only probed once.
+        """
+        digest = self.get_digest(src)
+        if digest is None:
+            return None
+        if digest not in self._video_info:
+            try:
+                self._video_info[digest] = mp4.probe(pathlib.Path(self.srcdir, src))
+            except (OSError, ValueError) as error:
+                logger.warning("cannot probe video file {}: {}".format(src, error))
+                return None
+        return self._video_info[digest]
+
+    def _load_video_info(self) -> dict[str, mp4.VideoInfo]:
+        path = pathlib.Path(self.doctreedir, VIDEO_INFO_NAME)
+        if not path.exists():
+            return {}
+        return dict(
+            (digest, mp4.VideoInfo(*info))
+            for digest, info in json.loads(path.read_text()).items()
+        )
+
+    def _save_video_info(self) -> None:
+        path = pathlib.Path(self.doctreedir, VIDEO_INFO_NAME)
+        path.write_text(json.dumps(self._video_info))
+
     def post_process_images(self, doctree: nodes.Node) -> None:
         super().post_process_images(doctree)
-        for node in list(doctree.findall(video)) + list(doctree.findall(source)):
-            self.images[node["src"]] = self.env.images[node["src"]][1]
+        docname = self.env.path2doc(doctree["source"]) or ""
+        with timing.measure("VideoBuilder.post_process_images", docname):
+            # videos are kept out of self.images so sphinx doesn't copy them
+            for node in find_media_nodes(doctree):
+                for path in get_media_paths(node):
+                    self.get_video_name(path)
+            for node in doctree.findall(video):
+                self._add_intrinsic_size(node)
+
+    def _add_intrinsic_size(self, node: video) -> None:
+        """Gives a video node the pixel dimensions and duration of its mp4.
+
+        Browsers use the width and height attributes to reserve space for the video before it loads, while the
+        displayed width is moved to its style.
+        """
+        paths = [
+            path
+            for child in [node, *node.findall(source)]
+            for path in get_media_paths(child)
+            if path.endswith(".mp4")
+        ]
+        info = self.get_video_info(paths[0]) if paths else None
+        if info is None:
+            return
+        if "width" in node:
+            node["style"] = "width: {}; height: auto;".format(node["width"])
+        node["width"] = info.width
+        node["height"] = info.height
+        node["data-duration"] = "{:.2f}".format(info.duration)
+
+    def finish(self) -> None:
+        super().finish()
+        self._save_video_info()
+
+    def copy_image_files(self) -> None:
+        super().copy_image_files()
+        if not self.videos:
+            return
+        with timing.measure("VideoBuilder.copy_image_files", "(publish)"):
+            self._publish_videos()
+
+    def _publish_videos(self) -> None:
+        # identical videos share a fingerprinted name, so each is only published once
+        sources = dict(
+            (name, src) for src, name in sorted(self.videos.items(), reverse=True)
+        )
+        counts = collections.Counter()
+        for name in display.status_iterator(
+            sorted(sources),
+            "publishing videos... ",
+            "brown",
+            len(sources),
+            self.config.verbosity,
+        ):
+            try:
+                method = publish.publish_file(
+                    pathlib.Path(self.srcdir, sources[name]),
+                    pathlib.Path(self.outdir, self.imagedir, name),
+                )
+                counts[method.value] += 1
+            except OSError as error:
+                logger.warning(
+                    "cannot publish video file {}: {}".format(sources[name], error)
+                )
+        logger.info(
+            "published videos: {}".format(
+                ", ".join(
+                    "{} {}".format(count, method) for method, count in counts.items()
+                )
+            )
+        )
+        self._remove_stale_videos(self._write_manifest())
+
+    def _write_manifest(self) -> dict[str, str]:
+        """Writes a manifest mapping the source path of each video to its url, relative to the output directory.
+
+        Entries of videos which weren't written this build are kept as long as the video is still in the project.
+        Returns the manifest.
+        """
+        path = pathlib.Path(self.outdir, MANIFEST_NAME)
+        manifest: dict[str, str] = json.loads(path.read_text()) if path.exists() else {}
+        manifest = dict(
+            (src, url) for src, url in manifest.items() if src in self.env.images
+        )
+        manifest.update(
+            (src, "{}/{}".format(self.imagedir, name))
+            for src, name in self.videos.items()
+        )
+        path.write_text(json.dumps(dict(sorted(manifest.items())), indent=4))
+        return manifest
+
+    def _remove_stale_videos(self, manifest: dict[str, str]) -> None:
+        """Removes the published videos which aren't in manifest, such as previous renders of a scene."""
+        urls = set(manifest.values())
+        removed = 0
+        for path in pathlib.Path(self.outdir, self.imagedir).iterdir():
+            # other files in the images directory are copied by sphinx and never fingerprinted
+            if not publish.is_fingerprinted(path.name):
+                continue
+            if "{}/{}".format(self.imagedir, path.name) not in urls:
+                path.unlink()
+                removed += 1
+        if removed:
+            logger.info("removed {} stale videos".format(removed))
 
 
 class VideoTranslator(html_writers.HTMLTranslator, docutils.SphinxTranslator):
     def _get_src_path(self, src: str) -> str:
-        return str(pathlib.PurePath(self.builder.imgpath) / pathlib.PurePath(src).name)
+        builder = cast(VideoBuilder, self.builder)
+        # parallel writers run in child processes, so the name must already be known from post_process_images (which
+        # always runs in the main process) rather than computed here and lost
+        return str(pathlib.PurePath(builder.imgpath) / builder.videos[src])
 
     def visit_source(self, node: source) -> None:
-        src_path = self._get_src_path(node["src"])
-        attributes = {"src": src_path, "type": node["type"]}
-        self.body.append(self.emptytag(node, "source", **attributes))
+        with timing.measure("VideoTranslator", self.builder.current_docname):
+            src_path = self._get_src_path(node["src"])
+            attributes = {"src": src_path, "type": node["type"]}
+            self.body.append(self.emptytag(node, "source", **attributes))
 
     def depart_source(self, _: source) -> None:
         """Exit the video node."""
         pass
 
     def visit_video(self, node: video) -> None:
-        if "src" in node:
-            node["src"] = self._get_src_path(node["src"])
+        with timing.measure("VideoTranslator", self.builder.current_docname):
+            self._visit_video(node)
+
+    def _visit_video(self, node: video) -> None:
+        for attribute in MEDIA_ATTRIBUTES:
+            if attribute in node:
+                node[attribute] = self._get_src_path(node[attribute])
 
         # key value attributes
         attributes: List[str] = [
@@ -112,9 +503,11 @@ class VideoTranslator(html_writers.HTMLTranslator, docutils.SphinxTranslator):
                 "crossorigin",
                 "height",
                 "width",
+                "style",
                 "poster",
                 "preload",
                 "src",
+                "data-duration",
             ]
             if k in node
         ]
@@ -132,6 +525,7 @@ class VideoTranslator(html_writers.HTMLTranslator, docutils.SphinxTranslator):
                     "loop",
                     "playsinline",
                     "muted",
+                    "data-autoplay",
                 ]
                 if k in node and node[k]  # value is truthy
             ]
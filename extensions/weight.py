@@ -0,0 +1,180 @@
+"""
+Audits the transfer weight of each page of the built website.
+
+Once an html build finishes, every page is parsed for the stylesheets, scripts, images and videos it loads, and the
+size of each is added to the weight of the page. Videos are weighed the way the animation directive loads them:
+posters are always loaded, while a video's first source (the format browsers pick) is only counted if it autoplays
+or is fully preloaded. Resources referenced from stylesheets (such as fonts) and external urls aren't counted.
+
+The pages are ranked by weight in page_weight.json in the doctree directory, and the heaviest are summarized in the
+build log. Set page_weight_budget in conf.py (or pass -D page_weight_budget=<bytes>) to fail the build when a page
+is heavier than the budget.
+"""
+
+from typing import NamedTuple
+
+import html.parser
+import json
+import pathlib
+import posixpath
+import urllib.parse
+
+from sphinx import application
+from sphinx.util import logging
+
+logger = logging.getLogger(__name__)
+
+REPORT_NAME: str = "page_weight.json"
+"The name of the page weight report in the doctree directory."
+
+TOP_PAGES: int = 5
+"The number of heaviest pages included in the build log."
+
+CATEGORIES: tuple[str, ...] = ("html", "css", "js", "images", "videos")
+"The categories page weight is broken down by."
+
+
+class Resource(NamedTuple):
+    category: str
+    url: str
+
+
+class _PageParser(html.parser.HTMLParser):
+    """Collects the resources a page loads."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.resources: list[Resource] = []
+        self._video: dict[str, str | None] | None = None
+        "The attributes of the video being parsed, or None outside of videos."
+        self._has_source = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attributes = dict(attrs)
+        if tag == "link" and attributes.get("rel") == "stylesheet":
+            self._add("css", attributes.get("href"))
+        elif tag == "script":
+            self._add("js", attributes.get("src"))
+        elif tag == "img":
+            self._add("images", attributes.get("src"))
+        elif tag == "video":
+            self._video = attributes
+            self._has_source = False
+            self._add("images", attributes.get("poster"))
+            self._add_video(attributes.get("src"))
+        elif tag == "source" and self._video is not None:
+            # browsers play the first source they support, which is the best format
+            if not self._has_source:
+                self._has_source = True
+                self._add_video(attributes.get("src"))
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "video":
+            self._video = None
+
+    def _add(self, category: str, url: str | None) -> None:
+        if url:
+            self.resources.append(Resource(category, url))
+
+    def _add_video(self, url: str | None) -> None:
+        assert self._video is not None
+        preload = self._video.get("preload")
+        # autoplay videos are loaded once they're scrolled into view, regardless of preload
+        autoplay = "autoplay" in self._video or "data-autoplay" in self._video
+        if autoplay or preload == "auto" or preload == "":
+            self._add("videos", url)
+
+
+def _resolve(page: pathlib.PurePosixPath, url: str) -> str | None:
+    """Returns the path (relative to the output directory) url refers to from page, or None if it's external."""
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme or parts.netloc:
+        return None
+    path = urllib.parse.unquote(parts.path)
+    return posixpath.normpath(posixpath.join(page.parent.as_posix(), path))
+
+
+def weigh_page(outdir: pathlib.Path, page: pathlib.PurePosixPath) -> dict[str, int]:
+    """Returns the number of bytes page (relative to outdir) loads in each category.
+
+    Resources loaded more than once by the page are only counted once.
+    """
+    html_path = outdir / page
+    parser = _PageParser()
+    parser.feed(html_path.read_text(encoding="utf-8"))
+
+    weights = dict.fromkeys(CATEGORIES, 0)
+    weights["html"] = html_path.stat().st_size
+    seen: set[str] = set()
+    for category, url in parser.resources:
+        path = _resolve(page, url)
+        if path is None or path in seen:
+            continue
+        seen.add(path)
+        try:
+            weights[category] += (outdir / path).stat().st_size
+        except OSError:
+            logger.warning("cannot weigh {} loaded by {}".format(url, page))
+    return weights
+
+
+def make_report(outdir: pathlib.Path) -> dict[str, dict[str, int]]:
+    """Returns the weight of each page in outdir by category, along with its total, heaviest first."""
+    report: dict[str, dict[str, int]] = {}
+    for html_path in outdir.rglob("*.html"):
+        page = pathlib.PurePosixPath(html_path.relative_to(outdir).as_posix())
+        weights = weigh_page(outdir, page)
+        report[str(page)] = {**weights, "total": sum(weights.values())}
+    return dict(sorted(report.items(), key=lambda item: (-item[1]["total"], item[0])))
+
+
+def _format_size(size: int) -> str:
+    return "{:.1f} KiB".format(size / 1024)
+
+
+def format_report(report: dict[str, dict[str, int]]) -> str:
+    """Returns the heaviest pages of a report returned by make_report as a table."""
+    columns = [*CATEGORIES, "total"]
+    lines = [
+        "{:<40}".format("page") + "".join("{:>13}".format(column) for column in columns)
+    ]
+    for page, weights in list(report.items())[:TOP_PAGES]:
+        lines.append(
+            "{:<40}".format(page)
+            + "".join(
+                "{:>13}".format(_format_size(weights[column])) for column in columns
+            )
+        )
+    return "\n".join(lines)
+
+
+def write_report(app: application.Sphinx, exception: Exception | None) -> None:
+    """Writes the page weight report and fails the build if a page is over budget."""
+    if exception is not None or app.builder.format != "html":
+        return
+    report = make_report(pathlib.Path(app.outdir))
+    pathlib.Path(app.doctreedir, REPORT_NAME).write_text(json.dumps(report, indent=4))
+    logger.info("heaviest pages:\n" + format_report(report))
+
+    budget = app.config.page_weight_budget
+    if not budget:
+        return
+    over_budget = [
+        (page, weights["total"])
+        for page, weights in report.items()
+        if weights["total"] > budget
+    ]
+    for page, total in over_budget:
+        logger.error(
+            "{} weighs {}, which is over the page weight budget of {}".format(
+                page, _format_size(total), _format_size(budget)
+            )
+        )
+    if over_budget:
+        app.statuscode = 1
+
+
+def register_page_weight(app: application.Sphinx) -> None:
+    """Registers the page weight audit with sphinx."""
+    app.add_config_value("page_weight_budget", 0, "", int)
+    app.connect("build-finished", write_report)
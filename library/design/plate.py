@@ -5,6 +5,7 @@ from library.style import color
 from library.math import tangent, vector
 from library.design import sketch
 from library.utils.type_utils import not_none
+from library.render import profiling
 
 
 class PlateCircle(sketch.Circle):
@@ -12,11 +13,19 @@ class PlateCircle(sketch.Circle):
         self.inside = inner_circle
         self.outside = outer_circle
         super().__init__(self.outside)
+        self.inside.add_updater(
+            profiling.timed_updater(
+                "PlateCircle", sketch.EntityUpdater(self._follow_updater)
+            ),
+            call_updater=True,
+        )
 
-        def follow(mobject: mn.Mobject) -> None:
-            mobject.move_to(self.get_center())
-
-        self.inside.add_updater(follow, call_updater=True)
+    def _follow_updater(
+        self, mobject: mn.Mobject, tracker: sketch.PointTracker
+    ) -> None:
+        center = self.get_center()
+        if tracker.changed(center):
+            mobject.move_to(center)
 
     def get_inner_radius(self) -> float:
         return self.inside.radius
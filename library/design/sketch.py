@@ -8,10 +8,12 @@ from abc import ABC, abstractmethod
 import enum
 
 import manim as mn
+import numpy as np
 
 from library.math import vector
 from library.style import color, animation
 from library.utils.type_utils import not_none
+from library.render import profiling
 
 
 class SketchState(color.Color, enum.Enum):
@@ -24,6 +26,43 @@ class AlignType(enum.IntEnum):
     VERTICAL = 1
 
 
+class PointTracker:
+    """Tracks whether a set of points changed since they were last checked.
+
+    Updaters use a tracker to skip the frames in which the points they follow didn't move, since moving a mobject
+    rewrites all of its points even when it doesn't go anywhere.
+    """
+
+    def __init__(self) -> None:
+        self._points: np.ndarray | None = None
+
+    def changed(self, *points: vector.Point2d) -> bool:
+        """Returns True (and remembers points) if points differ from the points given last time."""
+        current = np.array(points)
+        if self._points is not None and np.array_equal(self._points, current):
+            return False
+        self._points = current
+        return True
+
+
+class EntityUpdater:
+    """An updater which calls update(mobject, tracker) with a PointTracker of its own.
+
+    Entities use it instead of a closure so they can be pickled. Copies of the updated mobject (such as animation
+    targets) share the entity, as they would with a closure, rather than deep copying it through a bound method.
+    """
+
+    def __init__(self, update: Callable[[mn.Mobject, PointTracker], None]) -> None:
+        self._update = update
+        self._tracker = PointTracker()
+
+    def __call__(self, mobject: mn.Mobject) -> None:
+        self._update(mobject, self._tracker)
+
+    def __deepcopy__(self, memo: dict) -> EntityUpdater:
+        return EntityUpdater(self._update)
+
+
 class Base(mn.VMobject, ABC):
     """An abstract base class for Sketch entities."""
 
@@ -59,11 +98,11 @@ class Point(mn.Dot, Base):
 
     def follow(self, point_function: Callable[[], vector.Point2d]) -> Self:
         """Adds an updater function which causes this point to track the specified input."""
-
-        def updater(mobject: mn.Mobject):
-            mobject.move_to(point_function())
-
-        self.add_updater(updater, call_updater=True)
+        # a class (rather than a closure) keeps the point picklable
+        updater = _FollowUpdater(point_function)
+        self.add_updater(
+            profiling.timed_updater("Point.follow", updater), call_updater=True
+        )
         return self
 
     def get_group(self) -> mn.VGroup:
@@ -108,11 +147,14 @@ class Line(mn.VGroup, Base):
         self.start = _make_point(point=self.line.get_start())
         self.end = _make_point(point=self.line.get_end())
         super().__init__(self.start, self.end)
+        self.line.add_updater(
+            profiling.timed_updater("Line", EntityUpdater(self._line_updater))
+        )
 
-        def updater(mobject: mn.Mobject) -> None:
-            mobject.put_start_and_end_on(self.start.get_center(), self.end.get_center())
-
-        self.line.add_updater(updater)
+    def _line_updater(self, mobject: mn.Mobject, tracker: PointTracker) -> None:
+        start, end = self.start.get_center(), self.end.get_center()
+        if tracker.changed(start, end):
+            mobject.put_start_and_end_on(start, end)
 
     @override
     def get_group(self) -> mn.VGroup:
@@ -267,11 +309,14 @@ class Circle(ArcBase):
     def __init__(self, circle: mn.Circle):
         self.circle = circle
         super().__init__(self.circle)
+        self.arc.add_updater(
+            profiling.timed_updater("Circle", EntityUpdater(self._circle_updater))
+        )
 
-        def updater(mobject: mn.Mobject) -> None:
-            mobject.move_to(self.middle.get_center())
-
-        self.arc.add_updater(updater)
+    def _circle_updater(self, mobject: mn.Mobject, tracker: PointTracker) -> None:
+        center = self.middle.get_center()
+        if tracker.changed(center):
+            mobject.move_to(center)
 
     @override
     def get_group(self) -> mn.VGroup:
@@ -304,13 +349,18 @@ class Arc(ArcBase):
         self.start = _make_point().follow(self.arc.get_start)
         self.end = _make_point().follow(self.arc.get_end)
         super().__init__(self.arc)
+        self.arc.add_updater(
+            profiling.timed_updater("Arc", EntityUpdater(self._arc_updater))
+        )
 
-        def updater(mobject: mn.Mobject) -> None:
-            mobject.move_arc_center_to(self.middle.get_center())
-            self.start.update()
-            self.end.update()
-
-        self.arc.add_updater(updater)
+    def _arc_updater(self, mobject: mn.Mobject, tracker: PointTracker) -> None:
+        center = self.middle.get_center()
+        if not tracker.changed(center):
+            # the end points follow changes to the arc's shape using their own updaters
+            return
+        mobject.move_arc_center_to(center)
+        self.start.update()
+        self.end.update()
 
     @override
     def get_group(self) -> mn.VGroup:
@@ -335,6 +385,23 @@ class Arc(ArcBase):
         )
 
 
+class _FollowUpdater:
+    """Moves a mobject to the point returned by point_function whenever the point changes."""
+
+    def __init__(self, point_function: Callable[[], vector.Point2d]) -> None:
+        self._point_function = point_function
+        self._tracker = PointTracker()
+
+    def __call__(self, mobject: mn.Mobject) -> None:
+        point = self._point_function()
+        if self._tracker.changed(point):
+            mobject.move_to(point)
+
+    def __deepcopy__(self, memo: dict) -> _FollowUpdater:
+        # point_function is usually a bound method, so copying it would copy the mobject it follows
+        return _FollowUpdater(self._point_function)
+
+
 def _make_point(point: vector.Point2d = mn.ORIGIN) -> Point:
     return Point(mn.Dot(point, color=SketchState.NORMAL))
 
@@ -1,9 +1,11 @@
 from abc import ABC
 from typing import Any
+import contextlib
 import manim as mn
 
 from library.design import sketch
 from library.style import animation
+from library.render import profiling, renderer
 
 
 class Scene(mn.Scene, ABC):
@@ -11,30 +13,49 @@ class Scene(mn.Scene, ABC):
 
     CONSTRAINT_DELAY = 0.5
 
+    STILL_TIME: float | None = None
+    """The time of the state build --still exports and videos use as their poster. Defaults to the finished sketch,
+    just before it's torn down."""
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._static_mobjects: list[sketch.Base] = []
 
+    def _step(self, name: str, *values: Any) -> contextlib.AbstractContextManager:
+        """Returns a context which profiles a step named after name and the types of values."""
+        # None unless the worker is profiling the scene
+        profiler = profiling.current_profiler()
+        if profiler is None:
+            return contextlib.nullcontext()
+        types = ", ".join(type(value).__name__ for value in values)
+        return profiler.step("{}: {}".format(name, types) if types else name)
+
     def introduce(self, *mobjects: sketch.Base):
         """Introduces mobjects to the scene by calling create.
 
         The mobjects are also scheduled for removal at the end of the scene.
         """
-        self._static_mobjects.extend(mobjects)
-        self.play(mn.AnimationGroup(*[mn.Create(mobject) for mobject in mobjects]))
-        self.wait(self.CONSTRAINT_DELAY)
+        with self._step("introduce", *mobjects):
+            self._static_mobjects.extend(mobjects)
+            self.play(mn.AnimationGroup(*[mn.Create(mobject) for mobject in mobjects]))
+            self.wait(self.CONSTRAINT_DELAY)
 
     def run_group(self, *animation: mn.Animation | Any):
         """Runs the given animations in succession with a short delay."""
-        self.play(mn.Succession(*animation))
-        self.wait(self.CONSTRAINT_DELAY)
+        with self._step("run_group", *animation):
+            self.play(mn.Succession(*animation))
+            self.wait(self.CONSTRAINT_DELAY)
 
     def tear_down(self):
-        self.wait(animation.END_DELAY - self.CONSTRAINT_DELAY * 2)
+        if isinstance(self.renderer, renderer.HookRenderer):
+            self.renderer.capture_still(self)
+
+        with self._step("tear_down"):
+            self.wait(animation.END_DELAY - self.CONSTRAINT_DELAY * 2)
 
-        self.play(
-            mn.AnimationGroup(
-                *[mn.Uncreate(mobject) for mobject in self._static_mobjects]
+            self.play(
+                mn.AnimationGroup(
+                    *[mn.Uncreate(mobject) for mobject in self._static_mobjects]
+                )
             )
-        )
-        self.wait(self.CONSTRAINT_DELAY * 1.5)
+            self.wait(self.CONSTRAINT_DELAY * 1.5)
@@ -0,0 +1,132 @@
+"""
+A render cache which may be shared by several build processes at once.
+
+Entries are keyed by a hash of everything which affects a render. Each entry is guarded by its own lock file so
+only one process renders a given key at a time (single-flight); other processes wait for the lock and then reuse
+the committed result. Entries are written to a temporary file and committed with an atomic rename, so readers
+never observe a partially written video.
+
+Locks use flock, which isn't available on Windows. There, builds sharing a cache may render the same key at once,
+although each entry is still committed atomically.
+"""
+
+import hashlib
+import importlib.metadata
+import os
+import pathlib
+import shutil
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+library_path = pathlib.Path(__file__).parents[1]
+
+
+def _hash_files(hasher, paths: list[pathlib.Path]) -> None:
+    for path in sorted(paths):
+        hasher.update(str(path).encode())
+        hasher.update(path.read_bytes())
+
+
+def source_key(file_path: pathlib.Path, *values: str) -> str:
+    """Returns a key covering values, file_path, every module in library, and the installed version of manim."""
+    hasher = hashlib.sha256()
+    for value in values:
+        hasher.update(value.encode())
+    hasher.update(importlib.metadata.version("manim").encode())
+    _hash_files(hasher, [file_path])
+    _hash_files(hasher, list(library_path.glob("**/*.py")))
+    return hasher.hexdigest()[:16]
+
+
+def scene_key(file_path: pathlib.Path, scene_name: str, quality: str) -> str:
+    """Returns the cache key of a scene.
+
+    The key covers the scene's file, every module in library, the quality, and the installed version of manim.
+    """
+    return source_key(file_path, scene_name, quality)
+
+
+def default_file_mode() -> int:
+    """Returns the mode of a newly created file, e.g. 0o644.
+
+    Temporary files are only readable by their owner, so they must be given this mode before being renamed.
+    """
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def atomic_copy(source: pathlib.Path, target: pathlib.Path) -> None:
+    """Copies source to target such that target is never observed partially written."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temp_path = tempfile.mkstemp(
+        dir=target.parent, prefix=".{}.".format(target.name)
+    )
+    os.close(descriptor)
+    try:
+        shutil.copyfile(source, temp_path)
+        os.chmod(temp_path, default_file_mode())
+        os.replace(temp_path, target)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class EntryLock:
+    """An exclusive lock on a single cache entry which is shared across processes."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self._path = path
+        self._file = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Acquires the lock. Returns False if blocking is False and another process holds the lock."""
+        if self._file is not None:
+            return True
+        file = open(self._path, "a")
+        try:
+            if fcntl is not None:
+                fcntl.flock(file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            file.close()
+            return False
+        self._file = file
+        return True
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+
+class RenderCache:
+    def __init__(self, path: pathlib.Path, suffix: str = ".mp4") -> None:
+        self._path = path
+        self._suffix = suffix
+        self._path.mkdir(parents=True, exist_ok=True)
+
+    def entry_path(self, key: str) -> pathlib.Path:
+        """Returns the path the entry for key is (or will be) stored at."""
+        return self._path / "{}{}".format(key, self._suffix)
+
+    def lookup(self, key: str) -> pathlib.Path | None:
+        """Returns the path to a committed entry, or None if key has not been rendered."""
+        path = self.entry_path(key)
+        return path if path.exists() else None
+
+    def lock(self, key: str) -> EntryLock:
+        # lock files are never deleted; removing them would let two processes lock different files for one key
+        return EntryLock(self._path / "{}.lock".format(key))
+
+    def commit(self, key: str, file_path: pathlib.Path) -> pathlib.Path:
+        """Atomically stores file_path as the entry for key. The caller should hold the entry's lock."""
+        path = self.entry_path(key)
+        atomic_copy(file_path, path)
+        return path
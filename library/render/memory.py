@@ -0,0 +1,147 @@
+"""
+Optional memory profiling which takes tracemalloc snapshots around each play call of a scene.
+
+Memory profiling is enabled by setting the RENDER_MEMORY_PROFILE environment variable to the directory reports should
+be written to (build.py --memory-profile does this automatically). The report of each scene records the peak memory
+of the scene and of each play call, the memory retained by each play call, and the top allocation sites.
+"""
+
+import json
+import os
+import pathlib
+import tracemalloc
+
+import manim as mn
+
+ENV_VAR: str = "RENDER_MEMORY_PROFILE"
+
+TOP_SITES: int = 10
+"The number of allocation sites included in a report."
+
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+]
+
+
+def get_output_directory() -> pathlib.Path | None:
+    """Returns the directory memory profiles are written to, or None if memory profiling is disabled."""
+    value = os.environ.get(ENV_VAR)
+    return pathlib.Path(value) if value else None
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+
+def _format_sites(statistics: list) -> list[dict]:
+    return [
+        {
+            "site": "{}:{}".format(
+                stat.traceback[0].filename, stat.traceback[0].lineno
+            ),
+            "size": getattr(stat, "size_diff", stat.size),
+            "count": getattr(stat, "count_diff", stat.count),
+        }
+        for stat in statistics[:TOP_SITES]
+    ]
+
+
+class MemoryProfiler:
+    """Records memory usage around each play call by wrapping the play method of a renderer.
+
+    Tracing starts as soon as the profiler is created, so create it before the scene to include setup.
+    """
+
+    def __init__(
+        self, scene_name: str, renderer: mn.CairoRenderer, directory: pathlib.Path
+    ) -> None:
+        self._scene_name = scene_name
+        self._directory = directory
+        self._plays: list[dict] = []
+
+        play = renderer.play
+
+        def wrapper(scene: mn.Scene, *args, **kwargs) -> None:
+            current, _ = tracemalloc.get_traced_memory()
+            before = _take_snapshot()
+            # the snapshot is traced and held while play runs, so it is excluded from the peak
+            snapshot_size = tracemalloc.get_traced_memory()[0] - current
+            tracemalloc.reset_peak()
+            play(scene, *args, **kwargs)
+            peak = tracemalloc.get_traced_memory()[1] - snapshot_size
+            after = _take_snapshot()
+            statistics = after.compare_to(before, "lineno")
+            self._plays.append(
+                {
+                    "play": len(self._plays),
+                    "animations": [
+                        type(animation).__name__ for animation in scene.animations or []
+                    ],
+                    "peak": peak,
+                    "retained": sum(stat.size_diff for stat in statistics),
+                    "top_sites": _format_sites(statistics),
+                }
+            )
+
+        renderer.play = wrapper
+        tracemalloc.start()
+
+    @staticmethod
+    def from_environment(
+        scene_name: str, renderer: mn.CairoRenderer
+    ) -> "MemoryProfiler | None":
+        directory = get_output_directory()
+        return (
+            None
+            if directory is None
+            else MemoryProfiler(scene_name, renderer, directory)
+        )
+
+    def dump(self) -> None:
+        """Writes the memory report of the scene and stops tracing."""
+        current, _ = tracemalloc.get_traced_memory()
+        snapshot = _take_snapshot()
+        tracemalloc.stop()
+
+        report = {
+            "peak": max((play["peak"] for play in self._plays), default=current),
+            "final": current,
+            "plays": self._plays,
+            "top_sites": _format_sites(snapshot.statistics("lineno")),
+        }
+        self._directory.mkdir(parents=True, exist_ok=True)
+        (self._directory / "{}.json".format(self._scene_name)).write_text(
+            json.dumps(report, indent=4)
+        )
+
+
+def _megabytes(size: int) -> str:
+    return "{:.1f} MB".format(size / 1024 / 1024)
+
+
+def format_report(report: dict) -> str:
+    """Returns a report written by MemoryProfiler.dump as text."""
+    lines = [
+        "peak: {}, retained at end: {}".format(
+            _megabytes(report["peak"]), _megabytes(report["final"])
+        ),
+        "",
+        "{:<6} {:>10} {:>10}  {}".format("play", "peak", "retained", "animations"),
+    ]
+    for play in report["plays"]:
+        lines.append(
+            "{:<6} {:>10} {:>10}  {}".format(
+                play["play"],
+                _megabytes(play["peak"]),
+                _megabytes(play["retained"]),
+                ", ".join(play["animations"]),
+            )
+        )
+    lines.append("")
+    lines.append("top allocation sites:")
+    for site in report["top_sites"]:
+        lines.append("{:>10}  {}".format(_megabytes(site["size"]), site["site"]))
+    return "\n".join(lines)
@@ -0,0 +1,230 @@
+"""
+Writes movies in which static segments (holds) are encoded as a single long-duration frame.
+
+Frames are streamed to ffmpeg as in manim, except runs of identical frames are detected as they are added.
+Short runs are written normally, while long runs are encoded as a separate one frame segment whose frame lasts the
+entire hold. The segments are then joined (without re-encoding) using ffmpeg's concat demuxer, producing a variable
+frame rate mp4 which plays back identically to a constant frame rate render.
+
+Segments are encoded without B-frames, so every frame is presented in the order it is stored and the joined timestamps
+stay exact. The timestamps of the finished movie are checked against the frames which were added.
+"""
+
+import pathlib
+import shutil
+import subprocess
+import tempfile
+from fractions import Fraction
+
+import numpy as np
+from PIL import Image
+
+FFMPEG: str = "ffmpeg"
+
+MIN_HOLD_DURATION: float = 0.5
+"The minimum duration (in seconds) of a run of identical frames which is encoded as a single frame."
+
+_TIMESCALE_PER_FRAME: int = 1024
+"Ticks per frame of the mp4 track timescale. Every segment uses the same timescale so they can be concatenated."
+
+
+class CompactMovieWriter:
+    def __init__(
+        self, output: pathlib.Path, width: int, height: int, frame_rate: float
+    ) -> None:
+        self._output = output
+        self._width = width
+        self._height = height
+        self._frame_rate = Fraction(frame_rate).limit_denominator(1001)
+        self._min_hold_frames = max(2, int(MIN_HOLD_DURATION * frame_rate))
+
+        self._directory = pathlib.Path(tempfile.mkdtemp(prefix="movie-"))
+        self._segments: list[pathlib.Path] = []
+        self._stream: subprocess.Popen | None = None
+
+        self._pending: np.ndarray | None = None
+        self._pending_count = 0
+
+        # the index of the first frame each encoded frame is shown for, and the total number of frames
+        self._frame_starts: list[int] = []
+        self._num_frames = 0
+
+    def add_frame(self, frame: np.ndarray, num_frames: int = 1) -> None:
+        """Adds frame to the movie num_frames times."""
+        if self._pending is not None and np.array_equal(self._pending, frame):
+            self._pending_count += num_frames
+            return
+        self._flush()
+        self._pending = frame
+        self._pending_count = num_frames
+
+    def finish(self) -> None:
+        """Writes the movie to output and cleans up intermediate files."""
+        try:
+            self._flush()
+            self._close_stream()
+            if not self._segments:
+                raise ValueError("Cannot write a movie with no frames.")
+            self._concat()
+            self._check_timestamps()
+        finally:
+            shutil.rmtree(self._directory, ignore_errors=True)
+
+    def _flush(self) -> None:
+        if self._pending is None:
+            return
+        if self._pending_count >= self._min_hold_frames:
+            self._close_stream()
+            self._write_hold(self._pending, self._pending_count)
+            self._frame_starts.append(self._num_frames)
+            self._num_frames += self._pending_count
+        else:
+            stream = self._open_stream()
+            for _ in range(self._pending_count):
+                stream.stdin.write(self._pending.tobytes())  # type: ignore
+                self._frame_starts.append(self._num_frames)
+                self._num_frames += 1
+        self._pending = None
+        self._pending_count = 0
+
+    def _next_segment(self) -> pathlib.Path:
+        path = self._directory / "{:05}.mp4".format(len(self._segments))
+        self._segments.append(path)
+        return path
+
+    def _encode_command(self, input_rate: Fraction, path: pathlib.Path) -> list[str]:
+        """Returns an ffmpeg command which encodes raw frames from stdin, matching manim's settings."""
+        return [
+            FFMPEG,
+            "-y",
+            "-f",
+            "rawvideo",
+            "-s",
+            "{}x{}".format(self._width, self._height),
+            "-pix_fmt",
+            "rgba",
+            "-r",
+            str(input_rate),
+            "-i",
+            "-",
+            "-an",
+            "-loglevel",
+            "error",
+            "-vcodec",
+            "libx264",
+            "-pix_fmt",
+            "yuv420p",
+            # segments must share encoder parameters to be concatenated without re-encoding
+            "-profile:v",
+            "high",
+            "-level:v",
+            "4.2",
+            # without B-frames, decode order matches presentation order, so segments join without timestamp offsets
+            "-bf",
+            "0",
+            "-video_track_timescale",
+            str(int(self._frame_rate * _TIMESCALE_PER_FRAME)),
+            str(path),
+        ]
+
+    def _open_stream(self) -> subprocess.Popen:
+        if self._stream is None:
+            command = self._encode_command(self._frame_rate, self._next_segment())
+            self._stream = subprocess.Popen(command, stdin=subprocess.PIPE)
+        return self._stream
+
+    def _close_stream(self) -> None:
+        if self._stream is None:
+            return
+        self._stream.stdin.close()  # type: ignore
+        self._check(self._stream.wait())
+        self._stream = None
+
+    def _write_hold(self, frame: np.ndarray, num_frames: int) -> None:
+        # a single input frame at frame_rate / num_frames lasts for the entire hold
+        command = self._encode_command(
+            self._frame_rate / num_frames, self._next_segment()
+        )
+        self._check(subprocess.run(command, input=frame.tobytes()).returncode)
+
+    def _concat(self) -> None:
+        file_list = self._directory / "segments.txt"
+        file_list.write_text(
+            "".join("file '{}'\n".format(path.as_posix()) for path in self._segments)
+        )
+        self._output.parent.mkdir(parents=True, exist_ok=True)
+        command = [
+            FFMPEG,
+            "-y",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(file_list),
+            "-loglevel",
+            "error",
+            "-c",
+            "copy",
+            # moves the index to the start of the file, so browsers can start playing before the video is downloaded
+            "-movflags",
+            "+faststart",
+            str(self._output),
+        ]
+        self._check(subprocess.run(command).returncode)
+
+    def _check_timestamps(self) -> None:
+        """Raises a RuntimeError if the frames of output aren't shown at the times they were added."""
+        # framecrc lists the timestamps and duration of every packet without decoding the video
+        command = [
+            FFMPEG,
+            "-loglevel",
+            "error",
+            "-i",
+            str(self._output),
+            "-map",
+            "0:v:0",
+            "-c",
+            "copy",
+            "-f",
+            "framecrc",
+            "-",
+        ]
+        result = subprocess.run(command, capture_output=True, text=True)
+        self._check(result.returncode)
+        time_base = Fraction(1)
+        starts: list[Fraction] = []
+        end = Fraction(0)
+        for line in result.stdout.splitlines():
+            if line.startswith("#tb 0:"):
+                time_base = Fraction(line.split(":")[1].strip())
+            elif line and not line.startswith("#"):
+                _, _, pts, duration = [int(value) for value in line.split(",")[:4]]
+                starts.append(pts * time_base)
+                end = max(end, (pts + duration) * time_base)
+        starts.sort()
+
+        expected = [start / self._frame_rate for start in self._frame_starts]
+        tolerance = 1 / (2 * self._frame_rate)
+        if (
+            len(starts) != len(expected)
+            or any(
+                abs(start - time) > tolerance for start, time in zip(starts, expected)
+            )
+            or abs(end - self._num_frames / self._frame_rate) > tolerance
+        ):
+            raise RuntimeError(
+                "The timestamps of {} don't match the frames which were added".format(
+                    self._output
+                )
+            )
+
+    def _check(self, returncode: int) -> None:
+        if returncode != 0:
+            raise RuntimeError("ffmpeg exited with code {}".format(returncode))
+
+
+def write_poster(frame: np.ndarray, output: pathlib.Path) -> None:
+    """Writes a frame returned by a renderer to output as an image."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(frame).save(output)
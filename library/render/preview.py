@@ -0,0 +1,48 @@
+"""
+Tiles the frames captured at the end of each animation step into a single contact sheet image.
+"""
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from library.render import renderer
+
+COLUMNS: int = 4
+"The number of frames in each row of a contact sheet."
+
+PADDING: int = 8
+"The space (in pixels) around each frame."
+
+
+def remove_duplicates(samples: list[renderer.Sample]) -> list[renderer.Sample]:
+    """Removes samples which are identical to the sample before them."""
+    unique: list[renderer.Sample] = []
+    for sample in samples:
+        if not unique or not np.array_equal(unique[-1].frame, sample.frame):
+            unique.append(sample)
+    return unique
+
+
+def make_contact_sheet(samples: list[renderer.Sample]) -> Image.Image:
+    """Returns an image containing each sample, labeled with its step number and time."""
+    if not samples:
+        raise ValueError("Expected at least one sample.")
+
+    height, width = samples[0].frame.shape[:2]
+    columns = min(COLUMNS, len(samples))
+    rows = -(-len(samples) // columns)
+
+    sheet = Image.new(
+        "RGB",
+        (columns * (width + PADDING) + PADDING, rows * (height + PADDING) + PADDING),
+        "white",
+    )
+    draw = ImageDraw.Draw(sheet)
+    for i, sample in enumerate(samples):
+        x = PADDING + (i % columns) * (width + PADDING)
+        y = PADDING + (i // columns) * (height + PADDING)
+        sheet.paste(Image.fromarray(sample.frame).convert("RGB"), (x, y))
+        draw.text(
+            (x + 4, y + 4), "{}. {:.2f}s".format(i + 1, sample.time), fill="white"
+        )
+    return sheet
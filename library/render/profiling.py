@@ -0,0 +1,220 @@
+"""
+Optional instrumentation which records what each step of a scene costs.
+
+Profiling is enabled by setting the RENDER_PROFILE environment variable to the directory reports should be written
+to (build.py --profile does this automatically). The worker profiles every scene it runs, writing a json report of
+its frames, steps, and updaters along with a cProfile stats file to that directory. Only scenes which mark their
+steps (such as sketch_scene.Scene) have steps in their report.
+"""
+
+import contextlib
+import cProfile
+import dataclasses
+import json
+import os
+import pathlib
+import time
+from typing import Callable, Iterator
+
+import manim as mn
+
+ENV_VAR: str = "RENDER_PROFILE"
+
+
+def get_output_directory() -> pathlib.Path | None:
+    """Returns the directory profiles are written to, or None if profiling is disabled."""
+    value = os.environ.get(ENV_VAR)
+    return pathlib.Path(value) if value else None
+
+
+@dataclasses.dataclass
+class UpdaterStats:
+    calls: int = 0
+    time: float = 0
+
+
+_updater_stats: dict[str, UpdaterStats] = {}
+"The stats of the updaters of each entity type in the current process."
+
+_child_times: list[float] = []
+"The time spent in nested updaters, for each updater currently running."
+
+
+class _TimedUpdater:
+    """An updater which records the calls and time of the updater it wraps.
+
+    A class (rather than a closure) so updaters remain picklable.
+    """
+
+    def __init__(self, entity_type: str, updater: Callable) -> None:
+        self._entity_type = entity_type
+        # inspect.signature follows __wrapped__, which manim uses to decide whether to pass dt
+        self.__wrapped__ = updater
+
+    def __call__(self, *args, **kwargs):
+        _child_times.append(0)
+        start = time.perf_counter()
+        try:
+            return self.__wrapped__(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            child_time = _child_times.pop()
+            if _child_times:
+                _child_times[-1] += elapsed
+            stats = _updater_stats.setdefault(self._entity_type, UpdaterStats())
+            stats.calls += 1
+            stats.time += elapsed - child_time
+
+
+def timed_updater(entity_type: str, updater: Callable) -> Callable:
+    """Wraps updater so its calls and time are recorded under entity_type.
+
+    Time is exclusive of nested updaters (e.g. Arc calling update on its end points).
+    Returns updater unchanged when profiling is disabled.
+    """
+    if get_output_directory() is None:
+        return updater
+    return _TimedUpdater(entity_type, updater)
+
+
+_current: "StepProfiler | None" = None
+"The profiler of the scene running in the current process, or None if profiling is disabled."
+
+
+def current_profiler() -> "StepProfiler | None":
+    """Returns the profiler of the scene running in the current process, or None if profiling is disabled."""
+    return _current
+
+
+@dataclasses.dataclass
+class StepStats:
+    name: str
+    wall_time: float = 0
+    frames: int = 0
+    updater_time: float = 0
+    raster_time: float = 0
+
+
+class StepProfiler:
+    """Records the wall time, frames rendered, time spent in updaters, and time spent rasterizing for each step.
+
+    The scene's update_mobjects and its renderer's render and update_frame methods are wrapped to collect the stats.
+    """
+
+    def __init__(self, scene: mn.Scene, directory: pathlib.Path) -> None:
+        self._scene_name = type(scene).__name__
+        self._directory = directory
+        self.steps: list[StepStats] = []
+        self._current: StepStats | None = None
+        self._frames = 0
+        _updater_stats.clear()
+
+        scene.update_mobjects = self._wrap(scene.update_mobjects, "updater_time")
+        scene.renderer.update_frame = self._wrap(
+            scene.renderer.update_frame, "raster_time"
+        )
+        scene.renderer.render = self._wrap(scene.renderer.render, None, count=True)
+
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+
+    @staticmethod
+    def from_environment(scene: mn.Scene) -> "StepProfiler | None":
+        """Returns a profiler of scene (which becomes the current profiler), or None if profiling is disabled."""
+        global _current
+        directory = get_output_directory()
+        _current = None if directory is None else StepProfiler(scene, directory)
+        return _current
+
+    def _wrap(
+        self, function: Callable, field: str | None, count: bool = False
+    ) -> Callable:
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            if count:
+                self._frames += 1
+            if self._current is not None:
+                if field is not None:
+                    elapsed = time.perf_counter() - start
+                    setattr(
+                        self._current, field, getattr(self._current, field) + elapsed
+                    )
+                if count:
+                    self._current.frames += 1
+            return result
+
+        return wrapper
+
+    @contextlib.contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Records the stats of everything run inside the context as a single step."""
+        self._current = StepStats(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._current.wall_time = time.perf_counter() - start
+            self.steps.append(self._current)
+            self._current = None
+
+    def dump(self) -> None:
+        """Writes the step report and cProfile stats of the scene."""
+        self._profile.disable()
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._profile.dump_stats(self._directory / "{}.pstats".format(self._scene_name))
+        report = {
+            "frames": self._frames,
+            "steps": [dataclasses.asdict(step) for step in self.steps],
+            "updaters": {
+                entity_type: dataclasses.asdict(stats)
+                for entity_type, stats in _updater_stats.items()
+            },
+        }
+        (self._directory / "{}.json".format(self._scene_name)).write_text(
+            json.dumps(report, indent=4)
+        )
+
+
+def format_report(report: dict) -> str:
+    """Returns a report written by StepProfiler.dump as a table."""
+    lines = []
+    # scenes which don't mark their steps only report their updaters
+    if report["steps"]:
+        lines.append(
+            "{:<40} {:>8} {:>7} {:>9} {:>8}".format(
+                "step", "wall", "frames", "updaters", "raster"
+            )
+        )
+    for step in report["steps"]:
+        lines.append(
+            "{:<40} {:>7.2f}s {:>7} {:>8.2f}s {:>7.2f}s".format(
+                step["name"][:40],
+                step["wall_time"],
+                step["frames"],
+                step["updater_time"],
+                step["raster_time"],
+            )
+        )
+    if lines:
+        lines.append("")
+
+    frames = max(1, report.get("frames", 0))
+    lines.append(
+        "{:<40} {:>8} {:>9} {:>8} {:>12}".format(
+            "updater", "calls", "per frame", "time", "per frame"
+        )
+    )
+    for entity_type, stats in sorted(
+        report.get("updaters", {}).items(), key=lambda item: -item[1]["time"]
+    ):
+        lines.append(
+            "{:<40} {:>8} {:>9.1f} {:>7.2f}s {:>10.3f}ms".format(
+                entity_type,
+                stats["calls"],
+                stats["calls"] / frames,
+                stats["time"],
+                stats["time"] / frames * 1000,
+            )
+        )
+    return "\n".join(lines)
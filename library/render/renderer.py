@@ -0,0 +1,259 @@
+"""
+Renderers which run scenes in-process without writing frames through manim's file writer.
+
+HookRenderer replaces manim's per-frame output with overridable hooks. Subclasses decide which frames (if any) are
+rasterized and what is done with them.
+"""
+
+import dataclasses
+import pathlib
+
+import manim as mn
+import numpy as np
+
+from library.render import movie, vector
+
+
+class HookRenderer(mn.CairoRenderer):
+    """A cairo renderer which calls hooks instead of writing frames to a movie.
+
+    Scenes should be rendered with write_to_movie disabled so manim's file writer stays idle.
+    """
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.scene: mn.Scene | None = None
+        self.frame_duration: float = 1 / self.camera.frame_rate
+
+    def play(self, scene: mn.Scene, *args, **kwargs) -> None:
+        self.scene = scene
+        self.before_play(scene)
+        super().play(scene, *args, **kwargs)
+        self.after_play(scene)
+
+    def render(self, scene: mn.Scene, time: float, moving_mobjects) -> None:
+        self.time += self.frame_duration
+        self.on_frame(scene, moving_mobjects)
+
+    def freeze_current_frame(self, duration: float) -> None:
+        # matches the frame count used by manim
+        num_frames = int(duration / self.frame_duration)
+        self.time += num_frames * self.frame_duration
+        self.on_hold(num_frames)
+
+    def capture(self, scene: mn.Scene) -> np.ndarray:
+        """Rasterizes every mobject in scene and returns the resulting frame."""
+        self.static_image = None
+        mn.CairoRenderer.update_frame(self, scene)
+        return self.get_frame()
+
+    def before_play(self, scene: mn.Scene) -> None:
+        """Called before each call to play (including waits)."""
+        pass
+
+    def after_play(self, scene: mn.Scene) -> None:
+        """Called after each call to play (including waits)."""
+        pass
+
+    def on_frame(self, scene: mn.Scene, moving_mobjects) -> None:
+        """Called for each frame of an animation, after the scene has been updated to the frame's time."""
+        pass
+
+    def on_hold(self, num_frames: int) -> None:
+        """Called when the current frame is held for num_frames frames."""
+        pass
+
+    def capture_still(self, scene: mn.Scene) -> None:
+        """Called by scenes with the state which best represents them, e.g. a finished sketch before it's torn down."""
+        pass
+
+
+class MovieRenderer(HookRenderer):
+    """A renderer which writes a movie in which holds are encoded as a single long-duration frame.
+
+    If poster is given, a frame representing the scene is also written to it as an image. The first frame of most
+    scenes is empty, so the frame is chosen like the state written by StillRenderer: the first frame at or after
+    poster_time, the state passed to capture_still, or the final frame of the scene, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        output: pathlib.Path,
+        poster: pathlib.Path | None = None,
+        poster_time: float | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self._writer = movie.CompactMovieWriter(
+            output,
+            self.camera.pixel_width,
+            self.camera.pixel_height,
+            self.camera.frame_rate,
+        )
+        self._poster = poster
+        self._poster_time = poster_time
+        self._poster_frame: np.ndarray | None = None
+
+    def capture_still(self, scene: mn.Scene) -> None:
+        if self._poster is not None and self._poster_frame is None:
+            self._poster_frame = self.capture(scene)
+
+    def on_frame(self, scene: mn.Scene, moving_mobjects) -> None:
+        self.update_frame(scene, moving_mobjects)
+        frame = self.get_frame()
+        self._writer.add_frame(frame)
+        self._check_poster_time(frame)
+
+    def on_hold(self, num_frames: int) -> None:
+        # play has already updated the frame being held
+        frame = self.get_frame()
+        self._writer.add_frame(frame, num_frames)
+        self._check_poster_time(frame)
+
+    def _check_poster_time(self, frame: np.ndarray) -> None:
+        if (
+            self._poster_frame is None
+            and self._poster_time is not None
+            and self.time >= self._poster_time
+        ):
+            self._poster_frame = frame
+
+    def scene_finished(self, scene: mn.Scene) -> None:
+        super().scene_finished(scene)
+        self._writer.finish()
+        if self._poster is not None:
+            frame = (
+                self.get_frame() if self._poster_frame is None else self._poster_frame
+            )
+            movie.write_poster(frame, self._poster)
+
+
+def is_wait(scene: mn.Scene) -> bool:
+    """Returns True if the scene's current play call only waits."""
+    return all(isinstance(animation, mn.Wait) for animation in scene.animations or [])
+
+
+@dataclasses.dataclass
+class Sample:
+    time: float
+    frame: np.ndarray
+
+
+class NullRenderer(HookRenderer):
+    """A renderer which runs a scene's logic (animations and updaters) without rasterizing any frames."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.num_animations = 0
+
+    def update_frame(self, scene, mobjects=None, **kwargs) -> None:
+        pass
+
+    def save_static_frame_data(self, scene, static_mobjects) -> None:
+        self.static_image = None
+        return None
+
+    def after_play(self, scene: mn.Scene) -> None:
+        if not is_wait(scene):
+            self.num_animations += len(scene.animations or [])
+
+
+class VectorRenderer(NullRenderer):
+    """A renderer which writes an animated svg of the paths of every mobject instead of rasterizing frames."""
+
+    def __init__(self, output: pathlib.Path, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._writer = vector.AnimatedSvgWriter(output, self.camera)
+
+    def on_frame(self, scene: mn.Scene, moving_mobjects) -> None:
+        self._writer.add_frame(vector.capture(self.camera, scene), self.frame_duration)
+
+    def on_hold(self, num_frames: int) -> None:
+        if self.scene is not None:
+            self._writer.add_frame(
+                vector.capture(self.camera, self.scene),
+                num_frames * self.frame_duration,
+            )
+
+    def scene_finished(self, scene: mn.Scene) -> None:
+        super().scene_finished(scene)
+        self._writer.finish()
+
+
+class StillRenderer(NullRenderer):
+    """A renderer which writes a static svg of a single state of a scene instead of rasterizing frames.
+
+    The state written is the first frame at or after still_time, the state passed to capture_still, or the final
+    state of the scene, whichever comes first.
+    """
+
+    def __init__(
+        self, output: pathlib.Path, still_time: float | None = None, **kwargs
+    ) -> None:
+        super().__init__(**kwargs)
+        self._output = output
+        self._still_time = still_time
+        self._elements: list[tuple[mn.VMobject, vector.Attributes]] | None = None
+
+    def capture_still(self, scene: mn.Scene) -> None:
+        """Captures the current state of scene, unless a state has already been captured."""
+        if self._elements is None:
+            self._elements = vector.capture(self.camera, scene)
+
+    def on_frame(self, scene: mn.Scene, moving_mobjects) -> None:
+        if self._still_time is not None and self.time >= self._still_time:
+            self.capture_still(scene)
+
+    def on_hold(self, num_frames: int) -> None:
+        if self.scene is not None:
+            self.on_frame(self.scene, [])
+
+    def scene_finished(self, scene: mn.Scene) -> None:
+        super().scene_finished(scene)
+        self.capture_still(scene)
+        assert self._elements is not None
+        vector.write_still(self._output, self.camera, self._elements)
+
+
+class SamplingRenderer(NullRenderer):
+    """A renderer which only rasterizes sampled frames.
+
+    A frame is sampled at the end of each play call and, if sample_period is given, every sample_period seconds.
+    Updaters still run on every frame, so scene logic behaves exactly as it would during a full render.
+    """
+
+    def __init__(
+        self,
+        sample_period: float | None = None,
+        include_waits: bool = True,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self._sample_period = sample_period
+        self._next_sample_time = sample_period
+        self._include_waits = include_waits
+        self.samples: list[Sample] = []
+
+    def after_play(self, scene: mn.Scene) -> None:
+        super().after_play(scene)
+        if self._include_waits or not is_wait(scene):
+            self._sample(scene)
+
+    def on_frame(self, scene: mn.Scene, moving_mobjects) -> None:
+        self._sample_timestamps(scene)
+
+    def on_hold(self, num_frames: int) -> None:
+        self._sample_timestamps(self.scene)
+
+    def _sample_timestamps(self, scene: mn.Scene | None) -> None:
+        if scene is None or self._next_sample_time is None:
+            return
+        frame = None
+        while self.time >= self._next_sample_time:
+            if frame is None:
+                frame = self.capture(scene)
+            self.samples.append(Sample(self._next_sample_time, frame))
+            self._next_sample_time += self._sample_period
+
+    def _sample(self, scene: mn.Scene) -> None:
+        self.samples.append(Sample(self.time, self.capture(scene)))
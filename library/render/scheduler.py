@@ -0,0 +1,156 @@
+"""
+A scheduler which runs render processes in parallel while keeping their combined memory use within a budget.
+
+The peak resident memory of every render is recorded so later builds can estimate how much memory a scene needs
+before starting it. Renders killed by the kernel (typically by the OOM killer) are retried with lower concurrency.
+"""
+
+import collections
+import dataclasses
+import json
+import os
+import pathlib
+import signal
+import subprocess
+import sys
+from typing import Callable
+
+DEFAULT_ESTIMATE: int = 768 * 1024 * 1024
+"The memory (in bytes) assumed for a scene which has never been rendered before."
+
+MAX_ATTEMPTS: int = 3
+"The number of times a render is attempted before it is reported as failed."
+
+# ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+_RSS_UNIT: int = 1 if sys.platform == "darwin" else 1024
+
+
+def available_memory() -> int | None:
+    """Returns the memory (in bytes) currently available to new processes, or None if it cannot be determined."""
+    try:
+        with open("/proc/meminfo") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class MemoryStats:
+    """Stores the peak resident memory of previous renders, keyed by job name."""
+
+    def __init__(self, path: pathlib.Path) -> None:
+        self._path = path
+        self._peaks: dict[str, int] = {}
+        if path.exists():
+            try:
+                self._peaks = json.loads(path.read_text())
+            except ValueError:
+                # a corrupt stats file only costs us our estimates
+                pass
+
+    def estimate(self, name: str) -> int:
+        return self._peaks.get(name, DEFAULT_ESTIMATE)
+
+    def record(self, name: str, peak: int) -> None:
+        self._peaks[name] = peak
+
+    def save(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._path.write_text(json.dumps(self._peaks, indent=4, sort_keys=True))
+
+
+@dataclasses.dataclass
+class Job:
+    """A single render process."""
+
+    name: str
+    command: list[str]
+    on_success: Callable[[], None] | None = None
+    attempts: int = 0
+
+
+@dataclasses.dataclass
+class _Running:
+    job: Job
+    process: subprocess.Popen
+    estimate: int
+
+
+class Scheduler:
+    """Runs jobs with at most `jobs` processes at once.
+
+    A job is only started while the projected memory of every running job, plus the new job, fits in memory_budget.
+    A single job is always allowed to run so oversized scenes still render (serially).
+    """
+
+    def __init__(
+        self, stats: MemoryStats, jobs: int = 1, memory_budget: int | None = None
+    ) -> None:
+        self._stats = stats
+        self._concurrency = max(1, jobs)
+        self._memory_budget = memory_budget
+
+    def run(self, jobs: list[Job]) -> list[Job]:
+        """Runs every job to completion. Returns the jobs which failed."""
+        queue = collections.deque(jobs)
+        running: dict[int, _Running] = {}
+        failed: list[Job] = []
+
+        while queue or running:
+            while (job := self._next_admissible(queue, running)) is not None:
+                queue.remove(job)
+                job.attempts += 1
+                process = subprocess.Popen(job.command)
+                running[process.pid] = _Running(
+                    job, process, self._stats.estimate(job.name)
+                )
+
+            pid, status, usage = os.wait4(-1, 0)
+            if pid not in running:
+                continue
+            finished = running.pop(pid)
+            job = finished.job
+            # we reaped the process ourselves, so tell Popen not to wait on it again
+            finished.process.returncode = os.waitstatus_to_exitcode(status)
+            self._stats.record(job.name, usage.ru_maxrss * _RSS_UNIT)
+
+            if finished.process.returncode == 0:
+                if job.on_success is not None:
+                    job.on_success()
+            elif self._is_memory_kill(finished.process.returncode) and (
+                job.attempts < MAX_ATTEMPTS
+            ):
+                self._concurrency = max(1, self._concurrency // 2)
+                print(
+                    "{} was killed (likely out of memory), retrying with at most {} jobs".format(
+                        job.name, self._concurrency
+                    )
+                )
+                queue.appendleft(job)
+            else:
+                failed.append(job)
+
+        self._stats.save()
+        return failed
+
+    def _next_admissible(
+        self, queue: collections.deque[Job], running: dict[int, _Running]
+    ) -> Job | None:
+        """Returns the first queued job which may be started now, or None if no job fits."""
+        if not queue or len(running) >= self._concurrency:
+            return None
+        if not running:
+            return queue[0]
+        if self._memory_budget is None:
+            return queue[0]
+
+        projected = sum(item.estimate for item in running.values())
+        for job in queue:
+            if projected + self._stats.estimate(job.name) <= self._memory_budget:
+                return job
+        return None
+
+    def _is_memory_kill(self, returncode: int) -> bool:
+        return returncode == -signal.SIGKILL
@@ -0,0 +1,174 @@
+"""
+An optional cache of the mobjects a scene builds in setup.
+
+The snapshot cache is enabled by setting the RENDER_SNAPSHOT_CACHE environment variable to the directory snapshots
+are stored in (build.py --snapshot-cache does this automatically). The first run of a scene pickles the attributes
+and mobjects its setup method creates; later runs with the same inputs (renders, previews and verification alike)
+restore them instead of calling setup.
+
+Setup methods must therefore be free of side effects outside the scene (e.g. resetting module level state belongs
+in construct), and everything they create must be picklable (updaters should be methods rather than closures).
+
+Expensive mobjects built outside of setup (such as title text) may be cached individually using cached_mobject.
+"""
+
+from typing import Callable
+
+import importlib.metadata
+import inspect
+import os
+import pathlib
+import pickle
+import sys
+import tempfile
+
+import manim as mn
+
+from library.render import cache, profiling
+
+ENV_VAR: str = "RENDER_SNAPSHOT_CACHE"
+
+_SCENE_LISTS: tuple[str, ...] = ("mobjects", "foreground_mobjects")
+"Scene attributes which setup modifies in place (via add) rather than assigning."
+
+
+def get_cache_directory() -> pathlib.Path | None:
+    """Returns the directory snapshots are stored in, or None if the snapshot cache is disabled."""
+    value = os.environ.get(ENV_VAR)
+    return pathlib.Path(value) if value else None
+
+
+def _snapshot_key(file_path: pathlib.Path, *values: str) -> str:
+    """Returns a source key which also covers the versions of python and numpy, since pickles depend on both."""
+    return cache.source_key(
+        file_path, *values, sys.version, importlib.metadata.version("numpy")
+    )
+
+
+def scene_key(scene_class: type[mn.Scene]) -> str:
+    """Returns the key of the snapshot of a scene class's setup."""
+    file_path = pathlib.Path(inspect.getfile(scene_class))
+    # updaters are only wrapped for timing when profiling, so profiled snapshots are kept separate
+    profiled = str(profiling.get_output_directory() is not None)
+    return _snapshot_key(file_path, scene_class.__qualname__, "setup", profiled)
+
+
+class SnapshotCache:
+    def __init__(self, path: pathlib.Path) -> None:
+        self._path = path
+        self._path.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self._path / "{}.pickle".format(key)
+
+    def load(self, key: str) -> dict | None:
+        """Returns the snapshot stored under key, or None if there isn't one or it can't be unpickled."""
+        path = self._entry_path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "rb") as file:
+                return pickle.load(file)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+            # the snapshot is replaced once the setup has run again
+            print("Ignoring snapshot {}: {}".format(path, error), file=sys.stderr)
+            return None
+
+    def save(self, key: str, snapshot: dict) -> None:
+        """Stores snapshot under key. Raises an error if snapshot cannot be pickled."""
+        # pickle first so a failure doesn't leave a temporary file behind
+        data = pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+        descriptor, temp_path = tempfile.mkstemp(
+            dir=self._path, prefix=".{}.".format(key)
+        )
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, self._entry_path(key))
+
+
+_mobjects: dict[tuple[str, ...], mn.Mobject] = {}
+"The mobjects made by cached_mobject in the current process, keyed by their values."
+
+
+def cached_mobject(make: Callable[[], mn.Mobject], *values: str) -> mn.Mobject:
+    """Returns a copy of the mobject returned by make, which is only called once for each set of values.
+
+    make must only depend on values and the library. The mobject is also stored in the snapshot cache (if enabled),
+    so later runs restore it instead of calling make.
+    """
+    if values not in _mobjects:
+        _mobjects[values] = _load_mobject(make, values)
+    return _mobjects[values].copy()
+
+
+def _load_mobject(
+    make: Callable[[], mn.Mobject], values: tuple[str, ...]
+) -> mn.Mobject:
+    directory = get_cache_directory()
+    if directory is None:
+        return make()
+
+    snapshot_cache = SnapshotCache(directory)
+    key = _snapshot_key(pathlib.Path(__file__), "mobject", *values)
+    snapshot = snapshot_cache.load(key)
+    if snapshot is not None:
+        return snapshot["mobject"]
+
+    mobject = make()
+    try:
+        snapshot_cache.save(key, {"mobject": mobject})
+    except (pickle.PicklingError, TypeError, AttributeError) as error:
+        print("Not caching {}: {}".format(values, error), file=sys.stderr)
+    return mobject
+
+
+def _take_snapshot(scene: mn.Scene, before: dict) -> dict:
+    attributes = {
+        name: value
+        for name, value in vars(scene).items()
+        if name not in _SCENE_LISTS
+        and (name not in before or before[name] is not value)
+    }
+    # a single dict is pickled so references shared between attributes and mobjects are preserved
+    return {
+        "attributes": attributes,
+        **{name: getattr(scene, name) for name in _SCENE_LISTS},
+    }
+
+
+def _restore_snapshot(scene: mn.Scene, snapshot: dict) -> None:
+    vars(scene).update(snapshot["attributes"])
+    for name in _SCENE_LISTS:
+        setattr(scene, name, snapshot[name])
+
+
+def install(scene: mn.Scene) -> None:
+    """Replaces the setup method of scene with one which uses the snapshot cache.
+
+    Does nothing if the snapshot cache is disabled.
+    """
+    directory = get_cache_directory()
+    if directory is None:
+        return
+
+    snapshot_cache = SnapshotCache(directory)
+    key = scene_key(type(scene))
+    setup = scene.setup
+
+    def cached_setup() -> None:
+        snapshot = snapshot_cache.load(key)
+        if snapshot is not None:
+            _restore_snapshot(scene, snapshot)
+            return
+
+        before = dict(vars(scene))
+        setup()
+        try:
+            snapshot_cache.save(key, _take_snapshot(scene, before))
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            print(
+                "Not caching the setup of {}: {}".format(type(scene).__name__, error),
+                file=sys.stderr,
+            )
+
+    scene.setup = cached_setup
@@ -0,0 +1,354 @@
+"""
+Exports scenes as animated svgs rather than raster videos.
+
+Each frame, the bezier path and style of every vectorized mobject is converted to the attributes of an svg path,
+exactly as manim's cairo camera would draw it. Every mobject becomes a single path whose attributes only change
+(using discrete SMIL animations) on the frames where they actually change, so mobjects which stay still cost the
+same as a static svg. The result plays in an <img> tag without any scripts and stays sharp at any resolution.
+
+Paths are drawn in document order, so a mobject whose draw order changes (e.g. after being brought to the front)
+continues on a new path placed after the mobjects it is now drawn over.
+
+Single states of a scene (such as its final sketch) may also be written as static svgs, in which case consecutive
+strokes with the same style are merged into a single path.
+
+Only vectorized mobjects are exported; images and background strokes are ignored.
+"""
+
+import pathlib
+
+import manim as mn
+import numpy as np
+
+Attributes = dict[str, str]
+"""The attributes of an svg path, e.g. {"d": "M0,0C1,1 2,2 3,3", "stroke": "#ffffff"}."""
+
+DEFAULTS: Attributes = {
+    "fill-opacity": "1",
+    "stroke": "none",
+    "stroke-width": "1",
+    "stroke-opacity": "1",
+}
+"The values svg uses for attributes which are omitted."
+
+PRECISION: int = 1
+"The number of decimal places (in pixels) coordinates and widths are rounded to."
+
+OPACITY_PRECISION: int = 2
+"The number of decimal places opacities are rounded to."
+
+KEY_TIME_PRECISION: int = 5
+"The number of decimal places key times (fractions of the duration) are rounded to."
+
+
+def _format_number(value: float, precision: int = PRECISION) -> str:
+    # adding 0.0 turns -0.0 into 0.0
+    return "{:g}".format(round(float(value), precision) + 0.0)
+
+
+def _format_color(rgba: np.ndarray) -> str:
+    return "#{:02x}{:02x}{:02x}".format(
+        *(int(round(channel * 255)) for channel in rgba[:3])
+    )
+
+
+def _to_pixels(camera: mn.Camera, points: np.ndarray) -> np.ndarray:
+    """Converts points in scene coordinates to pixel coordinates (with y pointing down)."""
+    scale = np.array(
+        [
+            camera.pixel_width / camera.frame_width,
+            -camera.pixel_height / camera.frame_height,
+        ]
+    )
+    center = np.array([camera.pixel_width / 2, camera.pixel_height / 2])
+    return (points[:, :2] - camera.frame_center[:2]) * scale + center
+
+
+def get_path_data(camera: mn.Camera, vmobject: mn.VMobject) -> str:
+    """Returns the svg path data of vmobject in pixel coordinates. Mirrors manim's cairo camera."""
+    points = camera.transform_points_pre_display(vmobject, vmobject.points)
+    if len(points) == 0 or np.any(np.isnan(points)):
+        return ""
+    commands: list[str] = []
+    for subpath in vmobject.gen_subpaths_from_points_2d(points):
+        pixels = _to_pixels(camera, subpath)
+        coordinates = [
+            "{},{}".format(_format_number(x), _format_number(y)) for x, y in pixels
+        ]
+        # the first point of each cubic bezier is the last point of the previous one
+        curves = [
+            coordinates[i]
+            for i in range(len(coordinates))
+            if i % vmobject.n_points_per_cubic_curve != 0
+        ]
+        commands.append("M" + coordinates[0])
+        if curves:
+            commands.append("C" + " ".join(curves))
+        if vmobject.consider_points_equals_2d(subpath[0], subpath[-1]):
+            commands.append("Z")
+    return "".join(commands)
+
+
+def get_attributes(camera: mn.Camera, vmobject: mn.VMobject) -> Attributes | None:
+    """Returns the attributes of the svg path drawing vmobject, or None if vmobject isn't visible."""
+    attributes: Attributes = {}
+
+    fill = camera.get_fill_rgbas(vmobject)[0]
+    if fill[3] > 0:
+        attributes["fill"] = _format_color(fill)
+        if fill[3] < 1:
+            attributes["fill-opacity"] = _format_number(fill[3], OPACITY_PRECISION)
+    else:
+        attributes["fill"] = "none"
+
+    stroke = camera.get_stroke_rgbas(vmobject)[0]
+    # cairo line widths are in scene units, which are scaled to pixels
+    width = (
+        vmobject.get_stroke_width()
+        * camera.cairo_line_width_multiple
+        * camera.pixel_width
+        / camera.frame_width
+    )
+    if width > 0 and stroke[3] > 0:
+        attributes["stroke"] = _format_color(stroke)
+        attributes["stroke-width"] = _format_number(width)
+        if stroke[3] < 1:
+            attributes["stroke-opacity"] = _format_number(stroke[3], OPACITY_PRECISION)
+    elif attributes["fill"] == "none":
+        return None
+
+    path_data = get_path_data(camera, vmobject)
+    if not path_data:
+        return None
+    return {"d": path_data, **attributes}
+
+
+def capture(camera: mn.Camera, scene: mn.Scene) -> list[tuple[mn.VMobject, Attributes]]:
+    """Returns each visible mobject of scene and the attributes of the path drawing it, in draw order."""
+    elements: list[tuple[mn.VMobject, Attributes]] = []
+    for mobject in camera.get_mobjects_to_display(scene.mobjects):
+        if not isinstance(mobject, mn.VMobject):
+            continue
+        attributes = get_attributes(camera, mobject)
+        if attributes is not None:
+            elements.append((mobject, attributes))
+    return elements
+
+
+class _Track:
+    """The changes to the attributes of a single path over time. None means the path is hidden."""
+
+    def __init__(self) -> None:
+        self.changes: list[tuple[float, Attributes | None]] = []
+
+    @property
+    def current(self) -> Attributes | None:
+        return self.changes[-1][1] if self.changes else None
+
+    def set(self, time: float, attributes: Attributes | None) -> None:
+        if self.changes and self.changes[-1][0] == time:
+            self.changes[-1] = (time, attributes)
+        elif attributes != self.current:
+            self.changes.append((time, attributes))
+
+
+def _escape(value: str) -> str:
+    return value.replace("&", "&amp;").replace('"', "&quot;").replace("<", "&lt;")
+
+
+def _format_attributes(attributes: Attributes) -> str:
+    return " ".join(
+        '{}="{}"'.format(name, _escape(value)) for name, value in attributes.items()
+    )
+
+
+def _format_header(camera: mn.Camera) -> list[str]:
+    """Returns the opening svg tag and background of an svg of camera's frame."""
+    lines = [
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {0} {1}" width="{0}" height="{1}">'.format(
+            camera.pixel_width, camera.pixel_height
+        )
+    ]
+    background = np.append(
+        mn.ManimColor(camera.background_color).to_rgb(), camera.background_opacity
+    )
+    if background[3] > 0:
+        opacity = (
+            ' fill-opacity="{}"'.format(
+                _format_number(background[3], OPACITY_PRECISION)
+            )
+            if background[3] < 1
+            else ""
+        )
+        lines.append(
+            '<rect width="100%" height="100%" fill="{}"{}/>'.format(
+                _format_color(background), opacity
+            )
+        )
+    return lines
+
+
+def _get_style(attributes: Attributes) -> Attributes:
+    return dict((name, value) for name, value in attributes.items() if name != "d")
+
+
+def _is_mergeable(attributes: Attributes) -> bool:
+    """Returns True if attributes describe an opaque stroke without a fill.
+
+    Merging such paths doesn't change how they're drawn, unlike fills (whose winding may cancel) or translucent
+    strokes (whose overlaps would no longer be blended twice).
+    """
+    return (
+        attributes["fill"] == "none"
+        and "stroke" in attributes
+        and "stroke-opacity" not in attributes
+    )
+
+
+def write_still(
+    output: pathlib.Path,
+    camera: mn.Camera,
+    elements: list[tuple[mn.VMobject, Attributes]],
+) -> None:
+    """Writes a static svg of a single frame, as returned by capture, to output.
+
+    Consecutive opaque strokes with the same style are merged into a single path.
+    """
+    paths: list[Attributes] = []
+    for _, attributes in elements:
+        previous = paths[-1] if paths else None
+        if (
+            previous is not None
+            and _is_mergeable(attributes)
+            and _get_style(previous) == _get_style(attributes)
+        ):
+            previous["d"] += attributes["d"]
+        else:
+            paths.append(dict(attributes))
+
+    lines = _format_header(camera)
+    lines.extend("<path {}/>".format(_format_attributes(path)) for path in paths)
+    lines.append("</svg>")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text("\n".join(lines) + "\n")
+
+
+class AnimatedSvgWriter:
+    """Writes an animated svg of the frames added to it.
+
+    Each mobject is written as a path which loops along with every other path. A mobject gets a new path whenever it
+    is drawn before a path it used to be drawn after, so the paths are always in draw order.
+    """
+
+    def __init__(self, output: pathlib.Path, camera: mn.Camera) -> None:
+        self._output = output
+        self._header = _format_header(camera)
+        self._tracks: dict[int, _Track] = {}
+        "The current track of each mobject, keyed by id."
+        self._order: list[_Track] = []
+        "Every track, in the order their paths are drawn."
+        self._mobjects: list[mn.VMobject] = []
+        "Every mobject with a track, kept alive so their ids aren't reused."
+        self._time = 0.0
+
+    def add_frame(
+        self, elements: list[tuple[mn.VMobject, Attributes]], duration: float
+    ) -> None:
+        """Adds a frame, as returned by capture, which lasts duration seconds."""
+        indices = self._get_indices()
+        drawn = set()
+        # the index of the track of the previous element
+        index = -1
+        for mobject, attributes in elements:
+            key = id(mobject)
+            track = self._tracks.get(key)
+            if track is None:
+                self._mobjects.append(mobject)
+            if track is None or indices[id(track)] < index:
+                # new mobjects, and mobjects which are now drawn over a later path, continue on a new path
+                track = _Track()
+                self._tracks[key] = track
+                self._order.insert(index + 1, track)
+                indices = self._get_indices()
+            index = indices[id(track)]
+            drawn.add(id(track))
+            track.set(self._time, attributes)
+        for track in self._order:
+            if id(track) not in drawn:
+                track.set(self._time, None)
+        self._time += duration
+
+    def _get_indices(self) -> dict[int, int]:
+        """Returns the index of each track in the draw order, keyed by the id of the track."""
+        return dict((id(track), index) for index, track in enumerate(self._order))
+
+    def finish(self) -> None:
+        """Writes the svg to output."""
+        if self._time == 0:
+            raise ValueError("Cannot write an svg with no frames.")
+        lines = list(self._header)
+        for track in self._order:
+            lines.append(self._format_track(track))
+        lines.append("</svg>")
+        self._output.parent.mkdir(parents=True, exist_ok=True)
+        self._output.write_text("\n".join(lines) + "\n")
+
+    def _format_key_time(self, time: float) -> str:
+        return "{:g}".format(round(time / self._time, KEY_TIME_PRECISION))
+
+    def _format_animation(self, name: str, values: list[tuple[float, str]]) -> str:
+        # key times may collide once rounded, in which case the later value wins
+        key_times: dict[str, str] = {}
+        for time, value in values:
+            key_times[self._format_key_time(time)] = value
+        return '<animate attributeName="{}" values="{}" keyTimes="{}" dur="{}s" calcMode="discrete" repeatCount="indefinite"/>'.format(
+            name,
+            _escape(";".join(key_times.values())),
+            ";".join(key_times.keys()),
+            "{:g}".format(round(self._time, 3)),
+        )
+
+    def _format_track(self, track: _Track) -> str:
+        names = list(
+            dict.fromkeys(
+                name
+                for _, attributes in track.changes
+                if attributes is not None
+                for name in attributes
+            )
+        )
+
+        timelines: dict[str, list[tuple[float, str]]] = {"display": []}
+        if track.changes[0][0] > 0:
+            timelines["display"].append((0, "none"))
+        for time, attributes in track.changes:
+            values = {"display": "none" if attributes is None else "inline"}
+            if attributes is not None:
+                values.update(
+                    (name, attributes.get(name, DEFAULTS.get(name, "")))
+                    for name in names
+                )
+            for name, value in values.items():
+                timeline = timelines.setdefault(name, [])
+                if not timeline:
+                    # the path is hidden until it first appears, so its initial attributes can start at 0
+                    timeline.append((0, value))
+                elif timeline[-1][1] != value:
+                    timeline.append((time, value))
+
+        static = dict(
+            (name, timeline[0][1])
+            for name, timeline in timelines.items()
+            if len(timeline) == 1 and timeline[0][0] == 0
+        )
+        animations = [
+            self._format_animation(name, timeline)
+            for name, timeline in timelines.items()
+            if name not in static
+        ]
+        static.pop("display", None)
+        if not animations:
+            return "<path {}/>".format(_format_attributes(static))
+        return "<path {}>{}</path>".format(
+            _format_attributes(static), "".join(animations)
+        )
@@ -0,0 +1,74 @@
+"""
+Stores fingerprints of the frames sampled from each scene.
+
+Fingerprints are saved next to the file defining the scene (plate.py -> plate.fingerprints.json), and may either be
+committed along with changes to the scene or cached between builds (as CI does). A scene only needs a full render when
+its fingerprint changes.
+
+Antialiasing and font rasterization differ slightly between machines, so frames aren't hashed exactly. Instead, each
+frame is reduced to the average brightness of a coarse grid of cells, and fingerprints match when every cell is
+within TOLERANCE of the stored fingerprint.
+"""
+
+import json
+import pathlib
+
+import numpy as np
+
+GRID_SIZE: tuple[int, int] = (16, 9)
+"The number of columns and rows of cells each frame is reduced to."
+
+TOLERANCE: int = 8
+"The largest difference in the brightness (from 0 to 255) of a cell between matching frames."
+
+
+def fingerprint_frame(frame: np.ndarray) -> str:
+    """Returns the average brightness of each cell of frame (an rgb or rgba image) as a hex string."""
+    columns, rows = GRID_SIZE
+    brightness = frame[:, :, :3].mean(axis=2)
+    height, width = brightness.shape
+    # crop any pixels which don't fill a whole cell
+    brightness = brightness[: height - height % rows, : width - width % columns]
+    cells = brightness.reshape(rows, height // rows, columns, width // columns).mean(
+        axis=(1, 3)
+    )
+    return np.round(cells).astype(np.uint8).tobytes().hex()
+
+
+def _decode(frame: str) -> np.ndarray:
+    return np.frombuffer(bytes.fromhex(frame), dtype=np.uint8).astype(int)
+
+
+def is_match(stored: list[str] | None, fingerprint: list[str]) -> bool:
+    """Returns True if every frame of fingerprint is within TOLERANCE of the corresponding stored frame."""
+    if stored is None or len(stored) != len(fingerprint):
+        return False
+    for stored_frame, frame in zip(stored, fingerprint):
+        # fingerprints stored in another format never match
+        if len(stored_frame) != len(frame):
+            return False
+        if np.abs(_decode(stored_frame) - _decode(frame)).max() > TOLERANCE:
+            return False
+    return True
+
+
+def get_fingerprint_path(file_path: pathlib.Path) -> pathlib.Path:
+    return file_path.with_suffix(".fingerprints.json")
+
+
+def load_fingerprints(file_path: pathlib.Path) -> dict[str, list[str]]:
+    """Returns the stored fingerprints of each scene in file_path."""
+    path = get_fingerprint_path(file_path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_fingerprint(
+    file_path: pathlib.Path, scene_name: str, fingerprint: list[str]
+) -> None:
+    fingerprints = load_fingerprints(file_path)
+    fingerprints[scene_name] = fingerprint
+    get_fingerprint_path(file_path).write_text(
+        json.dumps(fingerprints, indent=4, sort_keys=True) + "\n"
+    )
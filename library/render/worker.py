@@ -0,0 +1,230 @@
+"""
+Runs a single scene in-process using one of the renderers in library.render.renderer.
+
+The build script runs this module in a subprocess for each scene, e.g.:
+    python -m library.render.worker verify website/design/plate/plate.py IntakePlateScene --output out.json
+"""
+
+import argparse
+import importlib
+import json
+import pathlib
+
+import manim as mn
+
+from library.render import (
+    renderer,
+    memory,
+    profiling,
+    snapshot,
+    verify as fingerprints,
+    preview as contact_sheet,
+)
+
+SAMPLE_PERIOD: float = 1
+"The period (in seconds) between sampled frames in verify mode, in addition to the end of each play call."
+
+VERIFY_CONFIG = {
+    "pixel_width": 320,
+    "pixel_height": 180,
+    "frame_rate": 15,
+}
+"Manim config used for verification. The resolution is only high enough to detect visual changes."
+
+PREVIEW_CONFIG = {
+    "pixel_width": 480,
+    "pixel_height": 270,
+    "frame_rate": 15,
+}
+"Manim config used for contact sheet previews."
+
+
+def quality_config(flag: str) -> dict:
+    """Returns the manim config of a quality flag, e.g. "l" for low quality."""
+    for quality in mn.QUALITIES.values():
+        if quality["flag"] == flag:
+            return {
+                key: quality[key]
+                for key in ("pixel_width", "pixel_height", "frame_rate")
+            }
+    raise ValueError("Unknown quality {}".format(flag))
+
+
+VECTOR_CONFIG = {
+    "pixel_width": 960,
+    "pixel_height": 540,
+    "frame_rate": 30,
+}
+"Manim config used for vector exports and stills. The resolution only sets the svg's coordinate system and default size."
+
+DRY_RUN_CONFIG = {
+    "pixel_width": 32,
+    "pixel_height": 18,
+    "frame_rate": 15,
+}
+"Manim config used for dry runs. Nothing is rasterized, so the resolution only needs to keep the aspect ratio."
+
+
+def load_scene(file_path: pathlib.Path, scene_name: str) -> type[mn.Scene]:
+    module_path = str(file_path).replace("/", ".").removesuffix(".py")
+    return getattr(importlib.import_module(module_path), scene_name)
+
+
+def run_scene(
+    scene_class: type[mn.Scene],
+    make_renderer,
+    config: dict,
+) -> renderer.HookRenderer:
+    """Renders scene_class using the renderer returned by make_renderer. Returns the renderer."""
+    config = {
+        "write_to_movie": False,
+        "save_last_frame": False,
+        "disable_caching": True,
+        "verbosity": "ERROR",
+        "progress_bar": "none",
+        **config,
+    }
+    with mn.tempconfig(config):
+        # the renderer's camera reads the config, so it must be created inside tempconfig
+        scene_renderer = make_renderer()
+        # None unless memory profiling is enabled
+        memory_profiler = memory.MemoryProfiler.from_environment(
+            scene_class.__name__, scene_renderer
+        )
+        scene = scene_class(renderer=scene_renderer)
+        # None unless profiling is enabled
+        step_profiler = profiling.StepProfiler.from_environment(scene)
+        snapshot.install(scene)
+        scene.render()
+        if step_profiler is not None:
+            step_profiler.dump()
+        if memory_profiler is not None:
+            memory_profiler.dump()
+    return scene_renderer
+
+
+def render(
+    scene_class: type[mn.Scene],
+    quality: str,
+    output: pathlib.Path,
+    poster: pathlib.Path | None = None,
+) -> None:
+    """Renders a scene to a movie at output, and optionally a poster of the scene to poster.
+
+    Scenes may choose the time of the poster's frame using a STILL_TIME attribute, like stills.
+    """
+    poster_time = getattr(scene_class, "STILL_TIME", None)
+    run_scene(
+        scene_class,
+        lambda: renderer.MovieRenderer(output, poster, poster_time),
+        quality_config(quality),
+    )
+
+
+def verify(scene_class: type[mn.Scene], output: pathlib.Path) -> None:
+    """Writes the fingerprints of sampled frames of a scene to output."""
+    result = run_scene(
+        scene_class,
+        lambda: renderer.SamplingRenderer(sample_period=SAMPLE_PERIOD),
+        VERIFY_CONFIG,
+    )
+    frames = [fingerprints.fingerprint_frame(sample.frame) for sample in result.samples]
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(frames))
+
+
+def preview(scene_class: type[mn.Scene], output: pathlib.Path) -> None:
+    """Writes a contact sheet of the frame at the end of each animation step of a scene to output."""
+    result = run_scene(
+        scene_class,
+        lambda: renderer.SamplingRenderer(include_waits=False),
+        PREVIEW_CONFIG,
+    )
+    samples = contact_sheet.remove_duplicates(result.samples)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    contact_sheet.make_contact_sheet(samples).save(output)
+
+
+def vector(scene_class: type[mn.Scene], output: pathlib.Path) -> None:
+    """Writes an animated svg of a scene to output."""
+    run_scene(
+        scene_class,
+        lambda: renderer.VectorRenderer(output),
+        VECTOR_CONFIG,
+    )
+
+
+def still(scene_class: type[mn.Scene], output: pathlib.Path) -> None:
+    """Writes a static svg of a scene to output.
+
+    Scenes may choose the time of the state written using a STILL_TIME attribute; otherwise their final state is used.
+    """
+    still_time = getattr(scene_class, "STILL_TIME", None)
+    run_scene(
+        scene_class,
+        lambda: renderer.StillRenderer(output, still_time),
+        VECTOR_CONFIG,
+    )
+
+
+def dry_run(scene_class: type[mn.Scene], output: pathlib.Path) -> None:
+    """Runs a scene's logic without rasterizing anything and writes a summary of the scene to output."""
+    result = run_scene(scene_class, renderer.NullRenderer, DRY_RUN_CONFIG)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "duration": result.time,
+                "plays": result.num_plays,
+                "animations": result.num_animations,
+            }
+        )
+    )
+
+
+def get_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Runs a single scene.")
+    parser.add_argument(
+        "mode",
+        choices=["render", "verify", "preview", "vector", "still", "dry-run"],
+        help="what to do with the scene",
+    )
+    parser.add_argument("file", type=pathlib.Path, help="the file defining the scene")
+    parser.add_argument("scene", help="the name of the scene")
+    parser.add_argument(
+        "-q",
+        "--quality",
+        choices=["l", "m", "h"],
+        default="l",
+        help="the quality to render at",
+    )
+    parser.add_argument(
+        "-o", "--output", type=pathlib.Path, required=True, help="the output file"
+    )
+    parser.add_argument(
+        "--poster",
+        type=pathlib.Path,
+        help="the poster image to write alongside the video in render mode",
+    )
+    return parser
+
+
+def main():
+    args = get_arg_parser().parse_args()
+    scene_class = load_scene(args.file, args.scene)
+    if args.mode == "render":
+        render(scene_class, args.quality, args.output, args.poster)
+    elif args.mode == "verify":
+        verify(scene_class, args.output)
+    elif args.mode == "preview":
+        preview(scene_class, args.output)
+    elif args.mode == "vector":
+        vector(scene_class, args.output)
+    elif args.mode == "still":
+        still(scene_class, args.output)
+    elif args.mode == "dry-run":
+        dry_run(scene_class, args.output)
+
+
+if __name__ == "__main__":
+    main()
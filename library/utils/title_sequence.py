@@ -1,5 +1,7 @@
+import functools
 import manim as mn
 from library.style import color, text
+from library.render import snapshot
 from library.utils.type_utils import not_none
 
 
@@ -35,6 +37,15 @@ class TitleSequence:
 
     def _make_text(self, title: str, color: color.Color) -> mn.Text:
         prefix = str(self._number) + ". " if self._add_numbers else ""
-        return mn.Text(
-            prefix + title, font_size=text.FontSize.LARGE, color=color
-        ).to_corner(mn.UP + mn.LEFT)
+        # pango renders every glyph of a Text, so each title is only built once and copied afterwards
+        return snapshot.cached_mobject(
+            functools.partial(_make_title, prefix + title, color),
+            prefix + title,
+            str(color),
+        )
+
+
+def _make_title(string: str, color: color.Color) -> mn.Text:
+    return mn.Text(string, font_size=text.FontSize.LARGE, color=color).to_corner(
+        mn.UP + mn.LEFT
+    )
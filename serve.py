@@ -0,0 +1,322 @@
+"""
+A preview server for the website.
+
+Serves the built website, rebuilding it whenever a file in the website folder changes and reloading any open pages
+once the rebuild finishes. Rebuilds are incremental, so sphinx only reads and writes the documents which changed.
+Videos are served with support for HTTP range requests so they can be seeked without downloading them first.
+"""
+
+from typing import BinaryIO
+
+import argparse
+import functools
+import http
+import http.server
+import io
+import os
+import pathlib
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+
+source_path = pathlib.Path("website")
+
+website_output_path = pathlib.Path("build/html")
+
+doctree_path = pathlib.Path("build/doctrees")
+
+exclude_folders = ["__pycache__"]
+
+POLL_INTERVAL: float = 0.5
+"The number of seconds between checks of the website folder for changes."
+
+RELOAD_PATH: str = "/_reload"
+"The url of the event stream which tells open pages to reload."
+
+KEEP_ALIVE_INTERVAL: float = 15
+"The number of seconds between keep-alive messages on the event stream, which detect closed pages."
+
+RELOAD_SCRIPT: str = """<script>
+new EventSource("{}").addEventListener("reload", () => location.reload());
+</script>
+""".format(RELOAD_PATH)
+"Injected into every served page to reload it when the website is rebuilt."
+
+
+class Reloader:
+    """Notifies the open pages whenever the website is rebuilt."""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        """The number of times the website has been rebuilt."""
+        with self._condition:
+            return self._generation
+
+    def notify(self) -> None:
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def wait(self, generation: int, timeout: float) -> int:
+        """Waits up to timeout seconds for a rebuild after generation. Returns the current generation."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._generation != generation, timeout)
+            return self._generation
+
+
+class _RangeFile:
+    """A file which only reads length bytes from its current position."""
+
+    def __init__(self, file: BinaryIO, length: int) -> None:
+        self._file = file
+        self._remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def parse_range(header: str, file_size: int) -> tuple[int, int] | None:
+    """Returns the first and last byte of a single range Range header, or None if it can't be satisfied.
+
+    Raises ValueError if the header isn't a single byte range, in which case the whole file should be sent.
+    """
+    unit, _, ranges = header.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        raise ValueError("Unsupported range {}".format(header))
+    first, _, last = ranges.strip().partition("-")
+    if not first:
+        # a suffix range, e.g. bytes=-500 is the last 500 bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return max(0, file_size - length), file_size - 1
+    start = int(first)
+    end = int(last) if last else file_size - 1
+    if start > end or start >= file_size:
+        return None
+    return start, min(end, file_size - 1)
+
+
+class PreviewHandler(http.server.SimpleHTTPRequestHandler):
+    extensions_map = {
+        **http.server.SimpleHTTPRequestHandler.extensions_map,
+        ".mp4": "video/mp4",
+        ".webm": "video/webm",
+    }
+
+    def __init__(self, *args, reloader: Reloader, **kwargs) -> None:
+        self.reloader = reloader
+        super().__init__(*args, **kwargs)
+
+    def end_headers(self) -> None:
+        self.send_header("Accept-Ranges", "bytes")
+        # pages and videos change with every rebuild
+        self.send_header("Cache-Control", "no-cache")
+        super().end_headers()
+
+    def do_GET(self) -> None:
+        if urllib.parse.urlsplit(self.path).path == RELOAD_PATH:
+            self._send_events()
+            return
+        super().do_GET()
+
+    def send_head(self) -> BinaryIO | _RangeFile | None:  # type: ignore
+        url_path = urllib.parse.urlsplit(self.path).path
+        path = pathlib.Path(self.translate_path(self.path))
+        if path.is_dir() and url_path.endswith("/"):
+            path = path / "index.html"
+        if not path.is_file():
+            # directory redirects and missing files
+            return super().send_head()
+        if path.suffix == ".html":
+            return self._send_page(path)
+        header = self.headers.get("Range")
+        if header is None:
+            return super().send_head()
+        try:
+            byte_range = parse_range(header, path.stat().st_size)
+        except ValueError:
+            return super().send_head()
+        return self._send_range(path, byte_range)
+
+    def _send_page(self, path: pathlib.Path) -> BinaryIO:
+        """Sends the headers of the page at path, with the reload script injected."""
+        page = path.read_text(encoding="utf-8")
+        head, body_end, tail = page.rpartition("</body>")
+        if body_end:
+            page = head + RELOAD_SCRIPT + body_end + tail
+        data = page.encode("utf-8")
+        self.send_response(http.HTTPStatus.OK)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        return io.BytesIO(data)
+
+    def _send_range(
+        self, path: pathlib.Path, byte_range: tuple[int, int] | None
+    ) -> _RangeFile | None:
+        """Sends the headers of byte_range of the file at path (or an error if the range can't be satisfied)."""
+        file_size = path.stat().st_size
+        if byte_range is None:
+            self.send_response(http.HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", "bytes */{}".format(file_size))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        start, end = byte_range
+        file = open(path, "rb")
+        file.seek(start)
+        self.send_response(http.HTTPStatus.PARTIAL_CONTENT)
+        self.send_header("Content-Type", self.guess_type(str(path)))
+        self.send_header(
+            "Content-Range", "bytes {}-{}/{}".format(start, end, file_size)
+        )
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        return _RangeFile(file, end - start + 1)
+
+    def _send_events(self) -> None:
+        """Streams a reload event to the page whenever the website is rebuilt, until the page is closed."""
+        self.send_response(http.HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        generation = self.reloader.generation
+        try:
+            while True:
+                current = self.reloader.wait(generation, KEEP_ALIVE_INTERVAL)
+                if current == generation:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    generation = current
+                    self.wfile.write(b"event: reload\ndata:\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format: str, *args) -> None:
+        # only log failed requests, since every page load requests dozens of files
+        if len(args) > 1 and str(args[1]).startswith(("4", "5")):
+            super().log_message(format, *args)
+
+
+def get_file_states(base: pathlib.Path) -> dict[pathlib.Path, tuple[int, int]]:
+    """Returns the modification time and size of every file in base."""
+    states = {}
+    for directory, directory_names, file_names in os.walk(base):
+        directory_names[:] = [
+            name for name in directory_names if name not in exclude_folders
+        ]
+        for name in file_names:
+            path = pathlib.Path(directory, name)
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            states[path] = (stat.st_mtime_ns, stat.st_size)
+    return states
+
+
+def find_changes(
+    before: dict[pathlib.Path, tuple[int, int]],
+    after: dict[pathlib.Path, tuple[int, int]],
+) -> list[pathlib.Path]:
+    """Returns the files which were added, modified, or removed between before and after."""
+    return sorted(
+        path
+        for path in before.keys() | after.keys()
+        if before.get(path) != after.get(path)
+    )
+
+
+def build_website(sphinx_options: list[str]) -> None:
+    """Incrementally builds the website, reading and writing only the documents which are out of date."""
+    command = [
+        "sphinx-build",
+        "-b",
+        "html",
+        "-d",
+        str(doctree_path),
+        str(source_path),
+        str(website_output_path),
+        *sphinx_options,
+    ]
+    subprocess.run(command)
+
+
+def watch(sphinx_options: list[str], reloader: Reloader) -> None:
+    """Rebuilds the website and reloads the open pages whenever a file in the website folder changes."""
+    states = get_file_states(source_path)
+    while True:
+        time.sleep(POLL_INTERVAL)
+        current_states = get_file_states(source_path)
+        changes = find_changes(states, current_states)
+        if not changes:
+            continue
+        states = current_states
+        print("Rebuilding after changes to {}".format(", ".join(map(str, changes))))
+        build_website(sphinx_options)
+        # files written while building (e.g. videos rendered on demand) are picked up by the next check
+        reloader.notify()
+
+
+def get_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Serves the website, rebuilding it and reloading open pages whenever the website folder changes."
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="The port to serve the website on. Defaults to 8000.",
+    )
+    parser.add_argument(
+        "--bind",
+        default="127.0.0.1",
+        help="The address to serve the website on. Defaults to 127.0.0.1.",
+    )
+    parser.add_argument(
+        "--no-render",
+        action="store_true",
+        help="Don't render missing or out of date videos when rebuilding.",
+    )
+    return parser
+
+
+def main():
+    args = get_arg_parser().parse_args()
+
+    sphinx_options = ["-D", "animation_render=0"] if args.no_render else []
+    build_website(sphinx_options)
+
+    reloader = Reloader()
+    handler = functools.partial(
+        PreviewHandler, directory=str(website_output_path), reloader=reloader
+    )
+    server = http.server.ThreadingHTTPServer((args.bind, args.port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print("Serving the website at http://{}:{}/".format(args.bind, args.port))
+
+    try:
+        watch(sphinx_options, reloader)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
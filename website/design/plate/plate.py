@@ -36,9 +36,9 @@ class IntakePlateScene(mn.Scene):
         ]
         boundary_order: list[int] = [1, 3, 4, 0]
         self._plate_group: plate.PlateGroup = plate.PlateGroup(points, boundary_order)
-        title.reset()
 
     def construct(self):
+        title.reset()
         self.play(title.next("Draw plate holes", color=inner_color))
         self.play(self._plate_group.draw_inner_circles())
 
@@ -72,9 +72,9 @@ class BoundaryRedrawScene(mn.Scene):
             self._right.get_group(),
             self._line.get_group(),
         )
-        title.reset()
 
     def construct(self):
+        title.reset()
         self.play(title.next("Add outer circle"))
         self.play(mn.GrowFromCenter(self._middle.outside))
 
@@ -102,9 +102,9 @@ class BoundaryConstraintScene(mn.Scene):
         right_start_point = self._tangent_points[1] + vector.point_2d(-2, 0.5)
 
         self._line: sketch.Line = sketch.make_line(left_start_point, right_start_point)
-        title.reset()
 
     def construct(self):
+        title.reset()
         self.play(title.next("Create line"))
         self.play(mn.Create(self._line))
 